@@ -0,0 +1,217 @@
+import sys
+import time
+import base64
+import importlib
+from budget import choose_model, record_images, record_usage
+
+# ==============================================================================
+# 0. 설정 & Lazy Import
+# ==============================================================================
+MODULE_NAMES = {
+    "VIRAL": "naver_blog_mass_appeal",
+    "ELEGANT": "naver_blog_elegant",
+    "KIDS": "naver_blog_kids_lesson_promo",
+    "SEASON": "naver_blog_winter_special"
+}
+
+# 글쓰기 모듈들이 실패했을 때 돌려주는 메시지의 머리말
+WRITER_ERROR_PREFIXES = ("❌", "⚠️")
+
+# 모듈 이름 -> 첫 import 에 걸린 시간(초). 프로세스 전체에서 공유됩니다.
+IMPORT_TIMINGS = {}
+
+def lazy_import(name):
+    """무거운 SDK(google.generativeai, requests 등)는 첫 사용 시점에만 import 하고, 걸린 시간을 기록합니다."""
+    if name in sys.modules:
+        return sys.modules[name]
+    t0 = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMINGS[name] = time.perf_counter() - t0
+    return module
+
+# ==============================================================================
+# 1. Agent Classes (Streamlit 없이도 쓸 수 있는 작업자들)
+# ==============================================================================
+
+class WriterAgent:
+    def write_draft(self, mode, topic, notes, candidate_count=1, studio=None):
+        module_name = MODULE_NAMES[mode]
+        try:
+            # 글쓰기 모듈이 끌어오는 SDK import 비용도 프로파일에 잡히도록 먼저 lazy_import
+            lazy_import("google.generativeai")
+            module = lazy_import(module_name)
+            importlib.reload(module)
+            if mode == "VIRAL": return module.generate_viral_blog_post(topic, notes, candidate_count, studio=studio)
+            elif mode == "ELEGANT": return module.generate_real_blog_post(topic, notes, candidate_count, studio=studio)
+            elif mode == "KIDS": return module.agent_blog_writer(topic, notes, candidate_count, studio=studio)
+            elif mode == "SEASON": return module.generate_winter_special_post(topic, notes, candidate_count, studio=studio)
+        except Exception as e: return f"❌ 오류: {e}"
+
+    def write_variants(self, mode, topic, notes, candidate_count, studio=None):
+        """
+        한 번의 generate_content 호출(candidate_count)로 여러 초안 후보를 받아 항상 리스트로 반환합니다.
+        글쓰기 모듈이 오류 메시지("❌ ...", "⚠️ ...")를 돌려주면 후보로 보여주지 않고 RuntimeError 로 올립니다.
+        """
+        drafts = self.write_draft(mode, topic, notes, candidate_count, studio=studio)
+        if not isinstance(drafts, list):
+            drafts = [drafts]
+        for draft in drafts:
+            if not draft or draft.startswith(WRITER_ERROR_PREFIXES):
+                raise RuntimeError(draft or f"{mode} 초안을 받지 못했습니다.")
+        return drafts
+
+class EditorAgent:
+    def __init__(self, api_key):
+        genai = lazy_import("google.generativeai")
+        genai.configure(api_key=api_key)
+        self.model_name = 'gemini-2.0-flash'
+
+    def edit_to_html(self, raw_text, mode):
+
+        style_guide = {
+            "VIRAL": "핵심 키워드 볼드 처리, 리스트 활용, 명쾌한 어조",
+            "ELEGANT": "우아한 인용구 활용, 여백의 미, 감성적인 문단 나눔",
+            "KIDS": "따뜻한 대화체 유지, 중요한 육아 정보 강조",
+            "WINTER": "긴박감 넘치는 강조 처리, 커리큘럼 표 스타일링"
+        }
+        # [핵심 수정] 네이버 스마트 에디터와 호환성 높은 스타일 적용
+        prompt = f"""
+        당신은 네이버 블로그 편집장입니다. 아래 [초안]을 바탕으로 블로그에 바로 붙여넣을 수 있는 **완벽한 HTML 원고**로 재작성하세요.
+        
+        [초안]:
+        {raw_text}
+        
+        [작업 지시사항]
+        1. **HTML 포맷팅**:
+           - 줄바꿈은 `<br>` 태그를 사용하세요. (문단 사이는 `<br><br>`)
+           - 소제목은 `<h3 style="color: #000; border-left: 5px solid #ffcc00; padding-left: 10px; margin: 30px 0 15px;">` 스타일을 적용하세요.
+           - 강조하고 싶은 문장은 `<b><span style="background-color: #fff5b1;">` (형광펜 효과) 등으로 꾸미세요.
+           - 인용구는 `<blockquote style="border: 1px solid #ddd; padding: 20px; background: #f9f9f9;">`를 사용하세요.
+        
+        2. **이미지 기획 (중요)**:
+           - 글의 흐름상 이미지가 들어가면 좋은 위치(최소 3곳 이상)에 `[IMAGE_REQ: (이미지에 대한 아주 구체적이고 글의 흐름에 맞는 묘사 500자 이상)]` 태그를 삽입하세요.
+           - **주의**: `<img>` 태그를 쓰지 말고, `[IMAGE_REQ: ...]` 텍스트 그대로 남기세요. 이것은 다음 단계의 화가(Painter)에게 보낼 지령입니다.
+        
+        3. **스타일 가이드**: {style_guide.get(mode, "가독성 좋게")}
+        
+        오직 결과물 HTML 코드만 출력하세요. (마크다운 코드블록 없이)
+        """
+        # 모델은 호출 시점의 남은 예산으로 고름 (앞 단계에서 많이 썼으면 저렴한 모델로)
+        model_name = choose_model(self.model_name)
+        model = lazy_import("google.generativeai").GenerativeModel(model_name)
+        response = model.generate_content(prompt)
+        record_usage(model_name, response)
+        return response.text.strip().replace("```html", "").replace("```", "")
+
+class ArtDirectorAgent:
+    """프롬프트 엔지니어: 한국어 상황 묘사를 고품질의 영어 AI 그림 프롬프트로 번역합니다."""
+    def __init__(self, api_key):
+        genai = lazy_import("google.generativeai")
+        genai.configure(api_key=api_key)
+        self.model_name = 'gemini-2.5-flash-preview-09-2025'
+
+    def create_prompt(self, korean_desc, mode):
+        # 블로그 전체 테마 유지 (일관성)
+        themes = {
+            "VIRAL": "Clean, bright professional photography style, high contrast, minimalist infographic vibe",
+            "ELEGANT": "Warm cinematic lighting, emotional atmosphere, shallow depth of field, classical music aesthetic, high resolution",
+            "KIDS": "Soft pastel tones, cute and heartwarming, educational illustration style or bright photography",
+            "WINTER": "Cozy winter atmosphere, focused study environment, warm indoor lighting, snow outside window hint"
+        }
+        theme_prompt = themes.get(mode, "High quality photography")
+        
+        prompt = f"""
+        Act as a world-class AI Art Director and Visual Creative Lead specializing in cinematic storytelling, fine-art composition, and editorial-grade concept development.
+
+        Your task: Transform the following Korean description into a meticulously detailed, professional-quality English prompt optimized for ‘Imagen 3.0’. Go beyond simple translation—elevate the concept with artistic depth, emotional tone, atmosphere, lighting, composition, and stylistic direction.
+
+        Requirements for the output prompt:
+        - SUPER HYPER REALISM SO EVEN CANNOT DISTINGUISH
+        - Ultra-clear subject framing, artistic perspective, and visual intention
+        - Specific camera language (e.g., focal length, angle, depth-of-field)
+        - Detailed lighting style (e.g., soft diffused morning light, dramatic rim lighting)
+        - Mood, texture, color palette, and artistic influences
+        - Environmental and contextual storytelling elements
+        - Physical details: gesture, expressions, posture, movement
+        - Editorial or fine-art tone suitable for premium visual generation
+        - Avoid generic phrases; prioritize evocative, purposeful description
+
+        Use this structure during enhancement:
+        1. Overall artistic concept
+        2. Subject details & emotional expression
+        3. Environment, composition & camera direction
+        4. Lighting style & color palette
+        5. Texture, mood & artistic influences
+
+        [Input Description]: {korean_desc}
+        [Overall Theme]: {theme_prompt}
+        [Subject]: Violin, Music Education, Students, Teacher.
+
+        Output ONLY the final, polished English prompt string—no explanations.
+        """
+
+        model_name = choose_model(self.model_name)
+        model = lazy_import("google.generativeai").GenerativeModel(model_name)
+        response = model.generate_content(prompt)
+        record_usage(model_name, response)
+        return response.text.strip()
+
+class PainterAgent:
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.model_name = "imagen-4.0-generate-001"
+
+    def draw_to_bytes(self, prompt):
+        """
+        프롬프트를 받아 이미지를 생성하고, 이미지의 바이너리(bytes) 데이터를 반환합니다.
+        """
+        requests = lazy_import("requests")
+        response = None
+        # 예산이 빠듯하면 저렴한 모델로 그리고, 그에 맞는 API 엔드포인트 URL 설정
+        model_name = choose_model(self.model_name)
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:predict"
+
+        # 1. 헤더 설정 (API 키 포함)
+        headers = {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key
+        }
+
+        # 2. 페이로드 구성
+        payload = {
+            "instances": [
+                {"prompt": prompt}
+            ],
+            "parameters": {
+                "sampleCount": 1,
+                "aspectRatio": "4:3"  # 필요에 따라 "1:1", "16:9" 등으로 변경 가능
+            }
+        }
+
+        try:
+            # 3. requests 라이브러리로 POST 요청
+            response = requests.post(url, headers=headers, json=payload)
+            
+            # HTTP 에러(400, 500 등)가 발생하면 예외 발생시킴
+            response.raise_for_status()
+
+            # 4. 결과 파싱 및 디코딩
+            result = response.json()
+            if "predictions" in result:
+                b64_image = result["predictions"][0]["bytesBase64Encoded"]
+                record_images(model_name)
+                return base64.b64decode(b64_image)
+            else:
+                print(f"응답에 이미지가 없습니다: {result}")
+                return None
+
+        except requests.exceptions.RequestException as e:
+            # 네트워크 오류나 API 오류 시 상세 내용 출력
+            print(f"API 요청 실패: {e}")
+            if response is not None:
+                print(f"상세 에러 메시지: {response.text}")
+            return None
+        except Exception as e:
+            # 기타 오류
+            print(f"오류 발생: {e}")
+            return None
@@ -1,18 +1,22 @@
 import streamlit as st
 import os
-import re
 import time
-import importlib
-import google.generativeai as genai
+import asyncio
+import functools
+from collections import deque
 from datetime import datetime
 import json
-import base64
-import urllib.request
-import urllib.error
-import zipfile
-import io
 import random
-import requests
+import uuid
+from studio_profiles import DEFAULT_STUDIO, load_studio_profiles
+from scheduler import FairShareScheduler
+from topic_suggestions import COMMON_TARGET_AGES, TopicSuggestionService
+from budget import BudgetLedger, choose_model, record_usage, use_run
+from agents import IMPORT_TIMINGS, EditorAgent, ArtDirectorAgent, PainterAgent, WriterAgent, lazy_import
+from pipeline import build_blog_pipeline
+
+# 매 rerun(위젯 입력마다 스크립트 전체 재실행) 소요 시간 측정 시작점
+_RERUN_STARTED = time.perf_counter()
 
 # ==============================================================================
 # 0. 시스템 설정 & Streamlit UI 초기화
@@ -20,7 +24,7 @@ import requests
 st.set_page_config(page_title="Violin Blog Master", page_icon="🎻", layout="wide")
 
 # [CSS 수정] 모바일 최적화 + 블로그 미리보기 스타일(Paper Style)
-st.markdown("""
+PAGE_CSS = """
     <style>
         /* 모바일 상단 여백 및 헤더 숨김 */
         .block-container { padding-top: 1.5rem !important; padding-bottom: 3rem !important; }
@@ -50,24 +54,44 @@ st.markdown("""
             color: black;
         }
     </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
 # API 키 로드
 if "GOOGLE_API_KEY" in st.secrets:
     os.environ["GOOGLE_API_KEY"] = st.secrets["GOOGLE_API_KEY"]
 api_key = os.environ.get("GOOGLE_API_KEY")
 
-MODULE_NAMES = {
-    "VIRAL": "naver_blog_mass_appeal",
-    "ELEGANT": "naver_blog_elegant",
-    "KIDS": "naver_blog_kids_lesson_promo",
-    "SEASON": "naver_blog_SEASON_special"
-}
+# VIOLIN_BLOG_PROFILE=1 이면 사이드바에 import/rerun 프로파일을 표시
+PROFILE_ENABLED = os.environ.get("VIOLIN_BLOG_PROFILE") == "1"
 
 if "input_topic" not in st.session_state: st.session_state.input_topic = ""
 if "input_notes" not in st.session_state: st.session_state.input_notes = ""
 if "result_zip" not in st.session_state: st.session_state.result_zip = None
 if "preview_html" not in st.session_state: st.session_state.preview_html = None
+if "draft_candidates" not in st.session_state: st.session_state.draft_candidates = None
+if "draft_mode" not in st.session_state: st.session_state.draft_mode = None
+if "draft_studio" not in st.session_state: st.session_state.draft_studio = None
+if "run_report" not in st.session_state: st.session_state.run_report = None
+
+# ==============================================================================
+# 0-1. 프로파일링
+# ==============================================================================
+@st.cache_resource
+def get_profile():
+    """프로세스 전체(모든 세션)에서 공유하는 import/rerun 시간 기록."""
+    return {"imports": IMPORT_TIMINGS, "reruns": deque(maxlen=100), "fragments": {}}
+
+def timed(fn):
+    """fragment 는 혼자 rerun 되므로 전체 rerun 시간에 안 잡힘. 함수 실행 시간을 따로 기록합니다."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            get_profile()["fragments"].setdefault(fn.__name__, deque(maxlen=100)).append(time.perf_counter() - t0)
+    return wrapper
 
 # ==============================================================================
 # 1. Agent Classes (로직 동일)
@@ -75,16 +99,26 @@ if "preview_html" not in st.session_state: st.session_state.preview_html = None
 
 class DirectorAgent:
     def get_mode_from_ui(self):
-        with st.sidebar:
-            st.header("🎬 Director Agent")
-            mode = st.radio("작전 모드", ("VIRAL (정보성)", "ELEGANT (감성)", "KIDS (유아)", "SEASON (특강)"), index=0)
-            return mode.split()[0]
+        st.header("🎬 Director Agent")
+        mode = st.radio("작전 모드", ("VIRAL (정보성)", "ELEGANT (감성)", "KIDS (유아)", "SEASON (특강)"), index=0, key="mode_choice")
+        return mode.split()[0]
 
-    def generate_random_content(self, api_key):
+    def get_variant_count_from_ui(self):
+        # 후보 수 > 1 이면 Writer 단계만 한 번에 여러 초안을 받아 비교 후 선택
+        return st.number_input("초안 후보 수 (Variants)", min_value=1, max_value=4, value=1, step=1, key="variant_count")
+
+    def get_studio_from_ui(self, profiles):
+        studio_id = st.selectbox("스튜디오", list(profiles), format_func=lambda sid: profiles[sid]["name"], key="studio_id")
+        return profiles[studio_id]
+
+    def generate_random_content(self, api_key, studio=None):
+        studio = studio or DEFAULT_STUDIO
+        genai = lazy_import("google.generativeai")
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        prompt = """
-        당신은 창의적인 바이올린 학원 마케팅 디렉터입니다.
+        model_name = choose_model('gemini-2.0-flash')
+        model = genai.GenerativeModel(model_name)
+        prompt = f"""
+        당신은 {studio['location']}에 있는 '{studio['name']}'의 창의적인 바이올린 학원 마케팅 디렉터입니다.
         아래 5가지 컨셉 중 하나를 랜덤하게 골라, 창의적이고 트렌디한 블로그 글 주제와 선생님의 메모를 작성하세요.
         
         [컨셉 후보]
@@ -97,183 +131,123 @@ class DirectorAgent:
         [요청사항]
         - 주제: 사람들의 클릭을 유도하는 매력적인 제목 스타일 또는 바이올린 개인레슨과 관련된 주제
         - 메모: 선생님이 겪은 구체적인 에피소드나 강조하고 싶은 핵심 포인트 (150자 내외)
-        - 출력: 오직 JSON 형식으로만 주세요. {"topic": "...", "notes": "..."}
+        - 출력: 오직 JSON 형식으로만 주세요. {{"topic": "...", "notes": "..."}}
         """
         try:
             response = model.generate_content(prompt)
+            record_usage(model_name, response)
             text = response.text.strip().replace("```json", "").replace("```", "")
             return json.loads(text)
         except:
             return {"topic": "주제 생성 실패", "notes": "다시 시도해주세요."}
 
-class WriterAgent:
-    def write_draft(self, mode, topic, notes):
-        module_name = MODULE_NAMES[mode]
-        try:
-            module = importlib.import_module(module_name)
-            importlib.reload(module)
-            if mode == "VIRAL": return module.generate_viral_blog_post(topic, notes)
-            elif mode == "ELEGANT": return module.generate_real_blog_post(topic, notes)
-            elif mode == "KIDS": return module.agent_blog_writer(topic, notes)
-            elif mode == "SEASON": return module.generate_SEASON_special_post(topic, notes)
-        except Exception as e: return f"❌ 오류: {e}"
-
-class EditorAgent:
-    def __init__(self, api_key):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-
-    def edit_to_html(self, raw_text, mode):
-
-        style_guide = {
-            "VIRAL": "핵심 키워드 볼드 처리, 리스트 활용, 명쾌한 어조",
-            "ELEGANT": "우아한 인용구 활용, 여백의 미, 감성적인 문단 나눔",
-            "KIDS": "따뜻한 대화체 유지, 중요한 육아 정보 강조",
-            "WINTER": "긴박감 넘치는 강조 처리, 커리큘럼 표 스타일링"
-        }
-        # [핵심 수정] 네이버 스마트 에디터와 호환성 높은 스타일 적용
-        prompt = f"""
-        당신은 네이버 블로그 편집장입니다. 아래 [초안]을 바탕으로 블로그에 바로 붙여넣을 수 있는 **완벽한 HTML 원고**로 재작성하세요.
-        
-        [초안]:
-        {raw_text}
-        
-        [작업 지시사항]
-        1. **HTML 포맷팅**:
-           - 줄바꿈은 `<br>` 태그를 사용하세요. (문단 사이는 `<br><br>`)
-           - 소제목은 `<h3 style="color: #000; border-left: 5px solid #ffcc00; padding-left: 10px; margin: 30px 0 15px;">` 스타일을 적용하세요.
-           - 강조하고 싶은 문장은 `<b><span style="background-color: #fff5b1;">` (형광펜 효과) 등으로 꾸미세요.
-           - 인용구는 `<blockquote style="border: 1px solid #ddd; padding: 20px; background: #f9f9f9;">`를 사용하세요.
-        
-        2. **이미지 기획 (중요)**:
-           - 글의 흐름상 이미지가 들어가면 좋은 위치(최소 3곳 이상)에 `[IMAGE_REQ: (이미지에 대한 아주 구체적이고 글의 흐름에 맞는 묘사 500자 이상)]` 태그를 삽입하세요.
-           - **주의**: `<img>` 태그를 쓰지 말고, `[IMAGE_REQ: ...]` 텍스트 그대로 남기세요. 이것은 다음 단계의 화가(Painter)에게 보낼 지령입니다.
-        
-        3. **스타일 가이드**: {style_guide.get(mode, "가독성 좋게")}
-        
-        오직 결과물 HTML 코드만 출력하세요. (마크다운 코드블록 없이)
-        """
-        response = self.model.generate_content(prompt)
-        return response.text.strip().replace("```html", "").replace("```", "")
-
-class ArtDirectorAgent:
-    """프롬프트 엔지니어: 한국어 상황 묘사를 고품질의 영어 AI 그림 프롬프트로 번역합니다."""
-    def __init__(self, api_key):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-preview-09-2025')
-
-    def create_prompt(self, korean_desc, mode):
-        # 블로그 전체 테마 유지 (일관성)
-        themes = {
-            "VIRAL": "Clean, bright professional photography style, high contrast, minimalist infographic vibe",
-            "ELEGANT": "Warm cinematic lighting, emotional atmosphere, shallow depth of field, classical music aesthetic, high resolution",
-            "KIDS": "Soft pastel tones, cute and heartwarming, educational illustration style or bright photography",
-            "WINTER": "Cozy winter atmosphere, focused study environment, warm indoor lighting, snow outside window hint"
-        }
-        theme_prompt = themes.get(mode, "High quality photography")
-        
-        prompt = f"""
-        Act as a world-class AI Art Director and Visual Creative Lead specializing in cinematic storytelling, fine-art composition, and editorial-grade concept development.
-
-        Your task: Transform the following Korean description into a meticulously detailed, professional-quality English prompt optimized for ‘Imagen 3.0’. Go beyond simple translation—elevate the concept with artistic depth, emotional tone, atmosphere, lighting, composition, and stylistic direction.
-
-        Requirements for the output prompt:
-        - SUPER HYPER REALISM SO EVEN CANNOT DISTINGUISH
-        - Ultra-clear subject framing, artistic perspective, and visual intention
-        - Specific camera language (e.g., focal length, angle, depth-of-field)
-        - Detailed lighting style (e.g., soft diffused morning light, dramatic rim lighting)
-        - Mood, texture, color palette, and artistic influences
-        - Environmental and contextual storytelling elements
-        - Physical details: gesture, expressions, posture, movement
-        - Editorial or fine-art tone suitable for premium visual generation
-        - Avoid generic phrases; prioritize evocative, purposeful description
-
-        Use this structure during enhancement:
-        1. Overall artistic concept
-        2. Subject details & emotional expression
-        3. Environment, composition & camera direction
-        4. Lighting style & color palette
-        5. Texture, mood & artistic influences
-
-        [Input Description]: {korean_desc}
-        [Overall Theme]: {theme_prompt}
-        [Subject]: Violin, Music Education, Students, Teacher.
-
-        Output ONLY the final, polished English prompt string—no explanations.
-        """
-
-        response = self.model.generate_content(prompt)
-        return response.text.strip()
-
-class PainterAgent:
-    def __init__(self, api_key):
-        self.api_key = api_key
-        self.model_name = "imagen-4.0-generate-001"
-        # API 엔드포인트 URL 설정
-        self.url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model_name}:predict"
-
-    def draw_to_bytes(self, prompt):
-        """
-        프롬프트를 받아 이미지를 생성하고, 이미지의 바이너리(bytes) 데이터를 반환합니다.
-        """
-        # 1. 헤더 설정 (API 키 포함)
-        headers = {
-            "Content-Type": "application/json",
-            "x-goog-api-key": self.api_key
-        }
-
-        # 2. 페이로드 구성
-        payload = {
-            "instances": [
-                {"prompt": prompt}
-            ],
-            "parameters": {
-                "sampleCount": 1,
-                "aspectRatio": "4:3"  # 필요에 따라 "1:1", "16:9" 등으로 변경 가능
-            }
-        }
-
-        try:
-            # 3. requests 라이브러리로 POST 요청
-            response = requests.post(self.url, headers=headers, json=payload)
-            
-            # HTTP 에러(400, 500 등)가 발생하면 예외 발생시킴
-            response.raise_for_status()
-
-            # 4. 결과 파싱 및 디코딩
-            result = response.json()
-            if "predictions" in result:
-                b64_image = result["predictions"][0]["bytesBase64Encoded"]
-                return base64.b64decode(b64_image)
-            else:
-                print(f"응답에 이미지가 없습니다: {result}")
-                return None
-
-        except requests.exceptions.RequestException as e:
-            # 네트워크 오류나 API 오류 시 상세 내용 출력
-            print(f"API 요청 실패: {e}")
-            if response is not None:
-                print(f"상세 에러 메시지: {response.text}")
-            return None
-        except Exception as e:
-            # 기타 오류
-            print(f"오류 발생: {e}")
-            return None
-
 # ==============================================================================
 # 2. Main UI & Orchestration
 # ==============================================================================
 st.title("🎻 Violin Blog Master")
 if not api_key: st.error("🚨 API Key가 없습니다."); st.stop()
 
-director = DirectorAgent()
-current_mode = director.get_mode_from_ui()
+@st.cache_resource
+def get_director():
+    return DirectorAgent()
+
+@st.cache_resource
+def get_studio_profiles():
+    return load_studio_profiles()
+
+@st.cache_resource
+def get_scheduler():
+    """모든 세션·스튜디오가 공유하는 워커 풀. 스튜디오별 weight 비율로 모델 호출 순서를 공정하게 나눕니다."""
+    weights = {sid: p["weight"] for sid, p in get_studio_profiles().items()}
+    return FairShareScheduler(weights, max_workers=int(os.environ.get("VIOLIN_BLOG_WORKERS", "4")))
+
+@st.cache_resource
+def get_ledger():
+    """실행·일·사용자별 지출 장부 (한도는 VIOLIN_BLOG_BUDGET_* 환경변수)."""
+    return BudgetLedger.from_env()
+
+def start_run(kind="post"):
+    # 로그인(st.user)이 없으면 세션마다 임시 사용자 ID를 부여.
+    # 새로고침·새 탭마다 ID 가 바뀌므로 per_user 한도는 로그인 사용자에게만 의미가 있고,
+    # 비로그인 사용 전체는 per_day 한도로 막습니다.
+    user = st.user.get("email") or st.session_state.setdefault("anon_user", f"anon-{uuid.uuid4().hex[:8]}")
+    return get_ledger().start_run(user, kind)
+
+@st.cache_resource
+def get_topic_service():
+    return TopicSuggestionService(get_scheduler(), ledger=get_ledger())
+
+director = get_director()
+studio_profiles = get_studio_profiles()
+scheduler = get_scheduler()
+
+@st.fragment
+@timed
+def sidebar_panel():
+    """사이드바 위젯 조작은 이 fragment만 재실행합니다. 값은 session_state(key)로 본문에 전달."""
+    studio = director.get_studio_from_ui(studio_profiles)
+    mode = director.get_mode_from_ui()
+    director.get_variant_count_from_ui()
+    # 스튜디오·모드가 바뀌면 본문(KIDS 추천 패널 등)도 달라지므로 전체 rerun
+    applied = st.session_state.get("sidebar_applied")
+    if applied is not None and applied != (studio["id"], mode):
+        st.rerun()
+
+with st.sidebar:
+    sidebar_panel()
+current_mode = st.session_state.mode_choice.split()[0]
+variant_count = st.session_state.variant_count
+studio_id = st.session_state.studio_id
+studio = studio_profiles[studio_id]
+st.session_state.sidebar_applied = (studio_id, current_mode)
 
 def apply_magic_fill():
-    with st.spinner("🎲 AI가 생각 중..."):
-        c = director.generate_random_content(api_key)
+    run = start_run("magic_fill")
+    with st.spinner("🎲 AI가 생각 중..."), use_run(run):
+        c = scheduler.run(studio_id, director.generate_random_content, api_key, studio)
         st.session_state['topic_input'] = c['topic']
         st.session_state['notes_input'] = c['notes']
+    run.finish()
+
+def use_suggested_topic(title):
+    st.session_state['topic_input'] = title
+
+@st.fragment(run_every=2)
+@timed
+def wait_for_topics(future):
+    """추천 주제를 생성하는 동안에만 그려지는 폴링 fragment. 끝나면 전체 rerun 으로 패널을 다시 그립니다."""
+    if future.done():
+        st.rerun()
+    st.caption("⏳ 추천 주제를 준비하고 있어요. 그동안 직접 입력하셔도 됩니다.")
+
+@st.fragment
+@timed
+def kids_topic_panel():
+    """KIDS 전략가의 추천 주제. 캐시에 있으면 바로, 없으면 백그라운드 생성이 끝나는 대로 보여줍니다."""
+    topic_service = get_topic_service()
+    with st.expander("🧒 KIDS 추천 주제", expanded=True):
+        target_age = st.selectbox("타겟 연령", COMMON_TARGET_AGES, index=1, accept_new_options=True, key="kids_target_age")
+        topics = topic_service.get(target_age, studio)
+        if topics is None:
+            future = topic_service.request(target_age, studio)
+            if not future.done():
+                wait_for_topics(future)
+                return
+            if future.exception():
+                st.warning(f"추천 주제를 받지 못했습니다: {future.exception()}")
+                if st.button("🔄 다시 시도", key="kids_topics_retry"):
+                    topic_service.request(target_age, studio, retry=True)
+                return
+            topics = future.result()
+        for i, t in enumerate(topics):
+            if st.button(f"[{t['category']}] {t['title']}", key=f"kids_topic_{i}", on_click=use_suggested_topic, args=(t['title'],), use_container_width=True):
+                # 주제 입력칸은 fragment 밖에 있으므로 전체 rerun 으로 반영
+                st.rerun()
+
+if current_mode == "KIDS":
+    # KIDS 모드 진입 시 대표 연령대를 미리 받아둠 (이미 신선하면 아무 것도 하지 않음)
+    get_topic_service().prefetch(studio)
+    kids_topic_panel()
 
 col1, col2 = st.columns([0.7, 0.3], gap="small")
 with col1: st.write(""); st.subheader("📝 주제 및 메모")
@@ -282,84 +256,115 @@ with col2: st.button("🎲 랜덤 자동채움", on_click=apply_magic_fill, use_
 topic = st.text_input("주제", value=st.session_state.input_topic, placeholder="작성할 글의 주제", key="topic_input")
 notes = st.text_area("메모", value=st.session_state.input_notes, height=150, placeholder="핵심 내용", key="notes_input")
 
+def run_pipeline(initial, status, studio_id):
+    """
+    Writer → Editor → Art Director → Painter 파이프라인을 실행해 미리보기 HTML과 ZIP을 만듭니다.
+    initial 에 draft 가 있으면 Writer 는 건너뜁니다. 모델 호출은 공유 스케줄러를 거쳐 studio_id 몫으로 실행됩니다.
+    """
+    pipeline = build_blog_pipeline(
+        WriterAgent(), EditorAgent(api_key), ArtDirectorAgent(api_key), PainterAgent(api_key),
+        submit=lambda fn, **kwargs: scheduler.submit(studio_id, fn, **kwargs),
+    )
+    pbar = None
+
+    def on_progress(event):
+        nonlocal pbar
+        stage, state = event["stage"], event["state"]
+        if state == "started" and stage == "writer":
+            status.write(f"📝 글 쓰는 중 ({initial['mode']})...")
+        elif state == "started" and stage == "editor":
+            status.write("✨ 예쁘게 꾸미는 중...")
+        elif state == "trimmed":
+            status.write(f"💰 예산에 맞춰 이미지를 {event['limit']}장으로 줄였습니다.")
+        elif state == "started" and stage == "paint" and event["total"]:
+            status.write(f"🎨 이미지 {event['total']}장 생성 시도...")
+            pbar = status.progress(0)
+        elif state == "progress" and stage == "paint":
+            pbar.progress(event["done"] / event["total"])
+            if not event["value"]:
+                status.write(f"⚠️ 이미지 {event['index']+1} 생성 실패")
+
+    result = asyncio.run(pipeline.run(initial, on_progress=on_progress))
+    if not any(result["images"]):
+        status.write("ℹ️ 생성된 이미지가 없어서 ZIP에 포함되지 않았습니다.")
+    st.session_state.preview_html = result["final_html"]
+    st.session_state.result_zip = result["zip_bytes"]
+
+
 if st.button("🚀 에이전트 팀 호출 (Start)", type="primary", use_container_width=True):
     if not topic: st.warning("주제를 입력하세요.")
     else:
         status = st.status("🚀 작업 시작...", expanded=True)
+        run = start_run()
         try:
-            # 1. Writer
-            writer = WriterAgent()
-            status.write(f"📝 글 쓰는 중 ({current_mode})...")
-            draft = writer.write_draft(current_mode, topic, notes)
-            
-            # 2. Editor
-            editor = EditorAgent(api_key)
-            status.write("✨ 예쁘게 꾸미는 중...")
-            html_content = editor.edit_to_html(draft, current_mode)
-
-            # 3. Art & Painter
-            art = ArtDirectorAgent(api_key)
-            paint = PainterAgent(api_key)
-            reqs = re.findall(r"\[IMAGE_REQ: (.*?)\]", html_content)
-            final_html = html_content
-            
-            # [수정] 이미지 데이터를 담을 임시 리스트 초기화
-            generated_imgs_list = []
-
-            if reqs:
-                pbar = status.progress(0)
-                status.write(f"🎨 이미지 {len(reqs)}장 생성 시도...")
-                
-                for i, r in enumerate(reqs):
-                    pbar.progress((i)/len(reqs))
-                    p = art.create_prompt(r, current_mode)
-                    
-                    # 이미지 생성 시도
-                    b = paint.draw_to_bytes(p)
-                    fname = f"image_{i+1}.png"
-                    
-                    if b:
-                        # [핵심 수정] 생성 성공 시 리스트에 데이터 추가
-                        generated_imgs_list.append((fname, b))
-                        
-                        # HTML 교체 (성공)
-                        rep = f"""<br><div style='background:#f1f3f5; padding:20px; text-align:center; border-radius:10px; margin: 10px 0;'>📸 <b>이미지 자리 ({fname})</b><br><span style='font-size:0.8em; color:#888;'>이곳에 다운받은 이미지를 넣으세요</span></div><br>"""
-                        final_html = final_html.replace(f"[IMAGE_REQ: {r}]", rep, 1)
-                    else:
-                        # HTML 교체 (실패)
-                        rep = f"""<br><div style='background:#fff0f0; padding:10px; text-align:center; border-radius:10px; color:red;'>⚠️ <b>이미지 생성 실패</b><br><span style='font-size:0.8em;'>{r}</span></div><br>"""
-                        final_html = final_html.replace(f"[IMAGE_REQ: {r}]", rep, 1)
-                        status.write(f"⚠️ 이미지 생성 실패: {r}")
-
-                pbar.progress(1.0)
-
-            st.session_state.preview_html = final_html
-            
-            # [핵심 수정] ZIP 파일 생성 시 리스트에 있는 데이터 쓰기
-            zip_buf = io.BytesIO()
-            with zipfile.ZipFile(zip_buf, "w") as zf:
-                # 1. HTML 파일 추가
-                zf.writestr("index.html", f"<html><body>{final_html}</body></html>")
-                
-                # 2. 이미지 파일들 추가 (리스트 순회)
-                if generated_imgs_list:
-                    for fname, data in generated_imgs_list:
-                        zf.writestr(fname, data)
+            with use_run(run):
+                if variant_count > 1:
+                    # 후보 비교 모드: Writer 만 먼저 실행하고, 고른 초안은 아래에서 파이프라인으로
+                    status.write(f"📝 초안 후보 {variant_count}개 쓰는 중 ({current_mode})...")
+                    # 이전 완성본이 새 후보 아래에 남지 않도록 정리
+                    st.session_state.result_zip = None
+                    st.session_state.preview_html = None
+                    st.session_state.draft_candidates = None
+                    st.session_state.draft_candidates = scheduler.run(studio_id, WriterAgent().write_variants, current_mode, topic, notes, variant_count, studio=studio)
+                    st.session_state.draft_mode = current_mode
+                    st.session_state.draft_studio = studio_id
+                    status.update(label="🗂️ 초안 후보가 준비되었습니다. 하나를 골라주세요!", state="complete", expanded=False)
                 else:
-                    status.write("ℹ️ 생성된 이미지가 없어서 ZIP에 포함되지 않았습니다.")
-
-            st.session_state.result_zip = zip_buf.getvalue()
-            
-            status.update(label="✅ 완성되었습니다!", state="complete", expanded=False)
+                    st.session_state.draft_candidates = None
+                    run_pipeline({"mode": current_mode, "topic": topic, "notes": notes, "studio": studio}, status, studio_id)
+                    status.update(label="✅ 완성되었습니다!", state="complete", expanded=False)
             
         except Exception as e: 
             status.update(label="에러 발생", state="error")
             st.error(f"Error details: {e}")
+        finally:
+            st.session_state.run_report = run.finish()
+
+# ==============================================================================
+# 2-1. 초안 후보 비교 & 선택 (Variants 모드)
+# ==============================================================================
+if st.session_state.draft_candidates:
+    st.divider()
+    st.subheader("🗂️ 초안 후보 비교")
+    candidates = st.session_state.draft_candidates
+    cols = st.columns(len(candidates))
+    for i, (col, cand) in enumerate(zip(cols, candidates)):
+        with col:
+            st.markdown(f"**초안 {i+1}**")
+            with st.container(height=500):
+                st.markdown(cand)
+
+    choice = st.radio("편집·이미지 단계로 보낼 초안", range(len(candidates)), format_func=lambda i: f"초안 {i+1}", horizontal=True)
+    if st.button("✅ 선택한 초안으로 계속", type="primary", use_container_width=True):
+        status = st.status("🚀 선택한 초안으로 작업 계속...", expanded=True)
+        run = start_run()
+        try:
+            with use_run(run):
+                run_pipeline({"draft": candidates[choice], "mode": st.session_state.draft_mode}, status, st.session_state.draft_studio)
+            st.session_state.draft_candidates = None
+            status.update(label="✅ 완성되었습니다!", state="complete", expanded=False)
+        except Exception as e:
+            status.update(label="에러 발생", state="error")
+            st.error(f"Error details: {e}")
+        finally:
+            st.session_state.run_report = run.finish()
+
+# 마지막 실행의 지출 내역
+if st.session_state.run_report:
+    report = st.session_state.run_report
+    st.caption(f"💰 마지막 실행 비용: ${report['spent']:.4f} (모델 호출 {report['calls']}회, 이미지 {report['images']}장)")
+    for message in report["degraded"]:
+        st.caption(f"↘️ {message}")
 
 # ==============================================================================
 # 3. 결과 뷰 (여기가 핵심 변경됨)
 # ==============================================================================
-if st.session_state.result_zip:
+@st.fragment
+@timed
+def result_view():
+    """미리보기 HTML과 다운로드 버튼은 이 fragment 안에서만 다시 그려집니다."""
+    if not st.session_state.result_zip:
+        return
     st.divider()
     st.subheader("🎉 완성된 원고")
     
@@ -385,7 +390,19 @@ if st.session_state.result_zip:
             use_container_width=True
         )
 
+result_view()
 
-
-
-
+# ==============================================================================
+# 4. 프로파일 (VIOLIN_BLOG_PROFILE=1)
+# ==============================================================================
+profile = get_profile()
+profile["reruns"].append(time.perf_counter() - _RERUN_STARTED)
+if PROFILE_ENABLED:
+    with st.sidebar.expander("⏱️ Profile", expanded=False):
+        reruns = list(profile["reruns"])
+        st.write(f"마지막 rerun: {reruns[-1]*1000:.1f} ms / 최근 {len(reruns)}회 평균: {sum(reruns)/len(reruns)*1000:.1f} ms")
+        for name, sec in profile["imports"].items():
+            st.write(f"import {name}: {sec*1000:.1f} ms")
+        for name, times in profile["fragments"].items():
+            times = list(times)
+            st.write(f"fragment {name}: 마지막 {times[-1]*1000:.1f} ms / 최근 {len(times)}회 평균 {sum(times)/len(times)*1000:.1f} ms")
@@ -0,0 +1,246 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, date
+
+# ==========================================
+# 1. 단가표 (Cost Model, USD)
+# ==========================================
+# 텍스트 모델: 100만 토큰당 (입력, 출력) 단가 / 이미지 모델: 장당 단가
+# 공개 단가가 바뀌면 여기만 수정하면 됩니다.
+TOKEN_PRICES = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash-preview-09-2025": (0.30, 2.50),
+    "gemini-3-pro-preview": (2.00, 12.00),
+}
+IMAGE_PRICES = {
+    "imagen-4.0-generate-001": 0.04,
+    "imagen-4.0-fast-generate-001": 0.02,
+}
+
+# 예산이 빠듯할 때 내려갈 한 단계 저렴한 모델
+CHEAPER_MODEL = {
+    "gemini-3-pro-preview": "gemini-2.5-flash-preview-09-2025",
+    "gemini-2.5-flash-preview-09-2025": "gemini-2.0-flash",
+    "imagen-4.0-generate-001": "imagen-4.0-fast-generate-001",
+}
+
+# 에디터가 "최소 3곳" 이라고만 요청받으므로, 한 번의 실행에서 그릴 이미지 수 상한
+MAX_IMAGES_PER_RUN = int(os.environ.get("VIOLIN_BLOG_MAX_IMAGES", "6"))
+
+# 실행·일·사용자 한도 중 어느 하나라도 남은 금액이 그 한도의 이 비율 아래로 떨어지면 저렴한 모델로 전환
+LOW_BUDGET_RATIO = 0.3
+
+# 이미지 한 장마다 아트 디렉터 호출(프롬프트 작성)이 한 번씩 따라붙음. 대략의 (입력, 출력+생각) 토큰 수
+ART_PROMPT_TOKENS = (600, 1_500)
+
+def _env_limit(name, default):
+    value = os.environ.get(name, default)
+    return float(value) if value else None
+
+# ==========================================
+# 2. 예산 장부 (Ledger)
+# ==========================================
+class BudgetLedger:
+    """
+    실행(run)·일(day)·사용자(user) 단위 지출을 기록하는 프로세스 공용 장부입니다.
+    각 실행의 지출 내역은 spend log(JSON Lines)에 한 줄씩 남고, 재시작 시 오늘 지출을 다시 읽어옵니다.
+    """
+    def __init__(self, per_run=None, per_day=None, per_user=None, log_path=None):
+        self.per_run = per_run
+        self.per_day = per_day
+        self.per_user = per_user
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._day_spent = {}    # date -> usd
+        self._user_spent = {}   # (date, user) -> usd
+        self._load_today()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            per_run=_env_limit("VIOLIN_BLOG_BUDGET_RUN", "0.50"),
+            per_day=_env_limit("VIOLIN_BLOG_BUDGET_DAY", "20"),
+            per_user=_env_limit("VIOLIN_BLOG_BUDGET_USER", "5"),
+            log_path=os.environ.get("VIOLIN_BLOG_SPEND_LOG", "spend_log.jsonl"),
+        )
+
+    def _load_today(self):
+        if not self.log_path or not os.path.exists(self.log_path):
+            return
+        today = date.today().isoformat()
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    at, user, spent = entry["at"], entry["user"], float(entry["spent"])
+                except (ValueError, KeyError, TypeError):
+                    # 기록 도중 종료되어 잘린 줄 등은 건너뜀
+                    continue
+                if at[:10] == today:
+                    self._add(user, spent)
+
+    def _add(self, user, usd):
+        today = date.today()
+        self._day_spent[today] = self._day_spent.get(today, 0.0) + usd
+        self._user_spent[(today, user)] = self._user_spent.get((today, user), 0.0) + usd
+
+    def start_run(self, user, kind="post"):
+        return RunBudget(self, user, kind)
+
+    def charge(self, user, usd):
+        with self._lock:
+            self._add(user, usd)
+
+    def limits_left(self, user):
+        """설정된 일/사용자 한도마다 (한도, 오늘 남은 금액) 쌍의 리스트."""
+        today = date.today()
+        with self._lock:
+            left = []
+            if self.per_day is not None:
+                left.append((self.per_day, self.per_day - self._day_spent.get(today, 0.0)))
+            if self.per_user is not None:
+                left.append((self.per_user, self.per_user - self._user_spent.get((today, user), 0.0)))
+        return left
+
+    def remaining(self, user):
+        """오늘 남은 일/사용자 한도 중 작은 값. 한도가 없으면 None."""
+        left = [usd for _, usd in self.limits_left(user)]
+        return min(left) if left else None
+
+    def write_report(self, report):
+        if not self.log_path:
+            return
+        with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+
+class RunBudget:
+    """한 번의 실행에서 쓴 비용과, 예산 때문에 낮춘 항목(degraded)을 기록합니다."""
+    def __init__(self, ledger, user, kind):
+        self.ledger = ledger
+        self.user = user
+        self.kind = kind
+        self.started = datetime.now()
+        self.spent = 0.0
+        self.items = []      # {"model", "usd", ...}
+        self.degraded = []   # 사람이 읽는 설명
+        self._lock = threading.Lock()
+
+    def charge(self, model, usd, **detail):
+        with self._lock:
+            self.spent += usd
+            self.items.append({"model": model, "usd": usd, **detail})
+        self.ledger.charge(self.user, usd)
+
+    def limits_left(self):
+        """실행 한도까지 더한 (한도, 남은 금액) 쌍의 리스트."""
+        left = self.ledger.limits_left(self.user)
+        if self.ledger.per_run is not None:
+            left.append((self.ledger.per_run, self.ledger.per_run - self.spent))
+        return left
+
+    def remaining(self):
+        left = [usd for _, usd in self.limits_left()]
+        return max(min(left), 0.0) if left else None
+
+    def is_low(self):
+        """어느 한도든 남은 금액이 그 한도의 LOW_BUDGET_RATIO 아래면 True."""
+        return any(usd < limit * LOW_BUDGET_RATIO for limit, usd in self.limits_left())
+
+    def note(self, message):
+        with self._lock:
+            if message not in self.degraded:
+                self.degraded.append(message)
+
+    def report(self):
+        return {
+            "at": self.started.isoformat(timespec="seconds"),
+            "user": self.user,
+            "kind": self.kind,
+            "spent": round(self.spent, 6),
+            "calls": len(self.items),
+            "images": sum(i.get("images", 0) for i in self.items),
+            "degraded": list(self.degraded),
+        }
+
+    def finish(self):
+        report = self.report()
+        self.ledger.write_report(report)
+        return report
+
+# ==========================================
+# 3. 현재 실행에 비용 기록하기 (Hooks)
+# ==========================================
+# 스케줄러 워커 스레드에도 contextvars 가 복사되므로, 에이전트·글쓰기 모듈은 인자 없이 현재 실행에 기록합니다.
+_current_run = ContextVar("current_run", default=None)
+
+@contextmanager
+def use_run(run):
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+def current_run():
+    return _current_run.get()
+
+def record_usage(model_name, response):
+    """
+    generate_content 응답의 usage_metadata 로 토큰 비용을 계산해 현재 실행에 기록합니다.
+    thinking 모델의 생각 토큰은 candidates_token_count 에 빠져 있지만 출력 단가로 청구되므로 출력에 포함합니다.
+    """
+    run = current_run()
+    usage = getattr(response, "usage_metadata", None)
+    if run is None or usage is None:
+        return
+    price_in, price_out = TOKEN_PRICES.get(model_name, (0.0, 0.0))
+    tokens_in = getattr(usage, "prompt_token_count", 0) or 0
+    tokens_total = getattr(usage, "total_token_count", 0) or 0
+    if tokens_total:
+        tokens_out = tokens_total - tokens_in
+    else:
+        tokens_out = (getattr(usage, "candidates_token_count", 0) or 0) + (getattr(usage, "thoughts_token_count", 0) or 0)
+    usd = (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+    run.charge(model_name, usd, tokens_in=tokens_in, tokens_out=tokens_out)
+
+def estimate_cost(model_name, tokens_in, tokens_out):
+    """TOKEN_PRICES 로 텍스트 호출 한 번의 예상 비용을 계산합니다."""
+    price_in, price_out = TOKEN_PRICES.get(model_name, (0.0, 0.0))
+    return (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+
+def record_images(model_name, count=1):
+    run = current_run()
+    if run is not None:
+        run.charge(model_name, IMAGE_PRICES.get(model_name, 0.0) * count, images=count)
+
+def choose_model(preferred):
+    """남은 예산이 적으면 CHEAPER_MODEL 을 따라 더 저렴한 모델을 고릅니다. (실행 밖에서는 그대로)"""
+    run = current_run()
+    if run is None or not run.is_low():
+        return preferred
+    remaining = run.remaining()
+    model = preferred
+    # 예산이 바닥나면 가장 저렴한 모델까지, 빠듯하면 한 단계만 내려감
+    while model in CHEAPER_MODEL:
+        model = CHEAPER_MODEL[model]
+        if remaining > 0:
+            break
+    if model != preferred:
+        run.note(f"예산 부족으로 {preferred} → {model}")
+    return model
+
+def max_images(model_name, extra_per_image=0.0):
+    """
+    현재 실행에서 그릴 수 있는 이미지 수 (MAX_IMAGES_PER_RUN 과 남은 예산 중 작은 쪽).
+    extra_per_image: 이미지마다 함께 드는 다른 비용 (예: 아트 디렉터 프롬프트 작성)
+    """
+    run = current_run()
+    remaining = run.remaining() if run is not None else None
+    if remaining is None:
+        return MAX_IMAGES_PER_RUN
+    price = IMAGE_PRICES.get(model_name, 0.0) + extra_per_image
+    affordable = int(remaining // price) if price else MAX_IMAGES_PER_RUN
+    return min(MAX_IMAGES_PER_RUN, affordable)
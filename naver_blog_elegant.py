@@ -1,5 +1,8 @@
 import os
 import google.generativeai as genai
+from studio_profiles import DEFAULT_STUDIO, get_teacher_vibe
+from budget import choose_model, record_usage
+from writer_utils import extract_drafts
 from datetime import datetime
 
 # ==========================================
@@ -9,17 +12,20 @@ from datetime import datetime
 api_key = os.environ.get("GOOGLE_API_KEY")
 
 # 블로그 설정 (교양 있고 차분한 톤앤매너)
-STUDIO_NAME = "다산 라미 바이올린"
-LOCATION = "남양주 다산신도시"
-TEACHER_VIBE = "차분하고 우아하며, 아이들을 진심으로 사랑하는 따뜻한 교육자"
+STUDIO_NAME = DEFAULT_STUDIO["name"]
+LOCATION = DEFAULT_STUDIO["location"]
+TEACHER_VIBE = get_teacher_vibe(DEFAULT_STUDIO, "ELEGANT")
 
 # ==========================================
 # 2. '품격 있는' 선생님 말투 생성기 (Refined Prompt)
 # ==========================================
-def generate_real_blog_post(topic, raw_notes):
-    
+def generate_real_blog_post(topic, raw_notes, candidate_count=1, studio=None):
+    studio = studio or DEFAULT_STUDIO
+    location = studio["location"]
+    teacher_vibe = get_teacher_vibe(studio, "ELEGANT")
+
     prompt = f"""
-    당신은 {LOCATION}에서 개인 레슨을 운영하는 '{TEACHER_VIBE}' 바이올린 선생님입니다.
+    당신은 {location}에서 개인 레슨을 운영하는 '{teacher_vibe}' 바이올린 선생님입니다.
     네이버 블로그에 올릴 글을 작성해야 하며, **신뢰감 있고 교양 있는 문체**를 사용해야 합니다.
     
     [입력 소스]
@@ -51,11 +57,13 @@ def generate_real_blog_post(topic, raw_notes):
 
     try:
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-preview-09-2025')
+        model_name = choose_model('gemini-2.5-flash-preview-09-2025')
+        model = genai.GenerativeModel(model_name)
         
         print(f"🎻 선생님(Elegant Ver.) 빙의 중... (주제: {topic})")
-        response = model.generate_content(prompt)
-        return response.text
+        response = model.generate_content(prompt, generation_config={"candidate_count": candidate_count})
+        record_usage(model_name, response)
+        return extract_drafts(response, candidate_count)
         
     except Exception as e:
         return f"❌ 에러가 발생했습니다: {e}"
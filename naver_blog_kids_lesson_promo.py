@@ -1,5 +1,9 @@
 import os
+import re
 import google.generativeai as genai
+from studio_profiles import DEFAULT_STUDIO
+from budget import choose_model, record_usage
+from writer_utils import extract_drafts
 from datetime import datetime
 
 # ==========================================
@@ -13,21 +17,25 @@ if api_key:
 else:
     print("⚠️ 경고: API 키가 설정되지 않았습니다.")
 
-STUDIO_NAME = "다산 라미 바이올린"
-LOCATION = "남양주 다산신도시"
+STUDIO_NAME = DEFAULT_STUDIO["name"]
+LOCATION = DEFAULT_STUDIO["location"]
 
 # ==========================================
 # 2. Agent 1: 주제 선정 요원 (Strategist)
 # ==========================================
-def agent_topic_selector(target_age):
+def agent_topic_selector(target_age, studio=None, season=None):
     """
     타겟 연령대(유아/초등)에 맞춰, 학부모가 반응할 만한 마케팅 소구점(Hook)을 찾아 주제를 제안합니다.
+    season 을 주면 그 계절의 관심사(입학, 방학 등)를 반영합니다.
     """
+    location = (studio or DEFAULT_STUDIO)["location"]
+    season_line = f"지금은 **{season}**이니, 이 시기 학부모의 관심사도 반영하세요." if season else ""
     print(f"\n🕵️ [Agent 1] {target_age} 대상 인기 키워드 분석 중...")
     
     prompt = f"""
-    당신은 {LOCATION}의 아동 음악 교육 마케팅 전략가입니다.
+    당신은 {location}의 아동 음악 교육 마케팅 전략가입니다.
     타겟 대상인 **'{target_age} 학부모'**들이 현재 가장 고민하고 관심을 가질만한 블로그 주제 5가지를 선정하세요.
+    {season_line}
     
     [분석 관점]
     1. **두뇌/신체 발달**: 소근육 발달, 좌뇌우뇌 균형, 바른 자세.
@@ -46,23 +54,40 @@ def agent_topic_selector(target_age):
 
     try:
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-preview-09-2025')
+        model_name = choose_model('gemini-2.5-flash-preview-09-2025')
+        model = genai.GenerativeModel(model_name)
         response = model.generate_content(prompt)
+        record_usage(model_name, response)
         return response.text
     except Exception as e:
         return f"❌ Agent 1 오류: {e}"
 
+TOPIC_LINE = re.compile(r"^\s*\d+[.)]\s*\[(?P<category>[^\]]+)\]\s*(?P<title>.+?)\s*$")
+
+def parse_topic_list(text):
+    """
+    agent_topic_selector 의 "1. [집중력] 제목" 형식 출력을 [{"category": ..., "title": ...}] 리스트로 바꿉니다.
+    형식에 맞지 않는 줄(설명, 오류 메시지 등)은 건너뜁니다.
+    """
+    topics = []
+    for line in text.splitlines():
+        m = TOPIC_LINE.match(line.replace("**", ""))
+        if m:
+            topics.append({"category": m.group("category").strip(), "title": m.group("title")})
+    return topics
+
 # ==========================================
 # 3. Agent 2: 글쓰기 요원 (Writer)
 # ==========================================
-def agent_blog_writer(selected_topic, raw_notes):
+def agent_blog_writer(selected_topic, raw_notes, candidate_count=1, studio=None):
     """
     선정된 주제를 바탕으로 아동 교육 전문가의 시선에서 따뜻하고 설득력 있는 글을 씁니다.
     """
+    location = (studio or DEFAULT_STUDIO)["location"]
     print(f"\n✍️ [Agent 2] '{selected_topic}' 주제로 원고 작성 중...")
     
     prompt = f"""
-    당신은 {LOCATION}에서 아이들을 진심으로 사랑하는 **'유아/초등 전문 바이올린 개인레슨 선생님'**입니다.
+    당신은 {location}에서 아이들을 진심으로 사랑하는 **'유아/초등 전문 바이올린 개인레슨 선생님'**입니다.
     Agent 1이 선정한 주제 **"{selected_topic}"**에 대해 블로그 글을 작성하세요.
     
     [입력 메모]: "{raw_notes}"
@@ -85,9 +110,11 @@ def agent_blog_writer(selected_topic, raw_notes):
     """
     
     try:
-        model = genai.GenerativeModel('gemini-3-pro-preview')
-        response = model.generate_content(prompt)
-        return response.text
+        model_name = choose_model('gemini-3-pro-preview')
+        model = genai.GenerativeModel(model_name)
+        response = model.generate_content(prompt, generation_config={"candidate_count": candidate_count})
+        record_usage(model_name, response)
+        return extract_drafts(response, candidate_count)
     except Exception as e:
         return f"❌ Agent 2 오류: {e}"
 
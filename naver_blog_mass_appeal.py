@@ -1,5 +1,8 @@
 import os
 import google.generativeai as genai
+from studio_profiles import DEFAULT_STUDIO, get_teacher_vibe
+from budget import choose_model, record_usage
+from writer_utils import extract_drafts
 from datetime import datetime
 
 # ==========================================
@@ -9,18 +12,21 @@ from datetime import datetime
 api_key = os.environ.get("GOOGLE_API_KEY")
 
 # 블로그 설정 (대중 노출/정보성/홍보형)
-STUDIO_NAME = "다산 라미 바이올린"
-LOCATION = "남양주 다산신도시"
+STUDIO_NAME = DEFAULT_STUDIO["name"]
+LOCATION = DEFAULT_STUDIO["location"]
 # VIBE: 친절하지만 핵심만 콕콕 짚어주는 정보통/해결사 느낌
-TEACHER_VIBE = "에너지 넘치고 명쾌한, 꿀팁 대방출하는 다산신도시 정보통"
+TEACHER_VIBE = get_teacher_vibe(DEFAULT_STUDIO, "VIRAL")
 
 # ==========================================
 # 2. '대중 노출형' 블로그 생성기 (Viral Prompt)
 # ==========================================
-def generate_viral_blog_post(topic, raw_notes):
-    
+def generate_viral_blog_post(topic, raw_notes, candidate_count=1, studio=None):
+    studio = studio or DEFAULT_STUDIO
+    location = studio["location"]
+    teacher_vibe = get_teacher_vibe(studio, "VIRAL")
+
     prompt = f"""
-    당신은 {LOCATION}에서 활동하는 블로그 마케팅 전문가이자 '{TEACHER_VIBE}' 바이올린 선생님입니다.
+    당신은 {location}에서 활동하는 블로그 마케팅 전문가이자 '{teacher_vibe}' 바이올린 선생님입니다.
     이번 글의 목적은 **'검색 노출'**과 **'대중적인 클릭 유도'**입니다. 바이올린을 잘 모르는 사람도 클릭하게 만들어야 합니다.
     
     [입력 소스]
@@ -57,11 +63,13 @@ def generate_viral_blog_post(topic, raw_notes):
 
     try:
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-preview-09-2025')
+        model_name = choose_model('gemini-2.5-flash-preview-09-2025')
+        model = genai.GenerativeModel(model_name)
         
         print(f"🔥 대중 픽(Viral Ver.) 글 쓰는 중... (주제: {topic})")
-        response = model.generate_content(prompt)
-        return response.text
+        response = model.generate_content(prompt, generation_config={"candidate_count": candidate_count})
+        record_usage(model_name, response)
+        return extract_drafts(response, candidate_count)
         
     except Exception as e:
         return f"❌ 에러가 발생했습니다: {e}"
@@ -1,5 +1,8 @@
 import os
 import google.generativeai as genai
+from studio_profiles import DEFAULT_STUDIO, get_teacher_vibe
+from budget import choose_model, record_usage
+from writer_utils import extract_drafts
 from datetime import datetime
 
 # ==========================================
@@ -9,19 +12,22 @@ from datetime import datetime
 api_key = os.environ.get("GOOGLE_API_KEY")
 
 # 블로그 설정 (겨울방학/특강 시즌 공략형)
-STUDIO_NAME = "다산 라미 바이올린"
-LOCATION = "남양주 다산신도시"
+STUDIO_NAME = DEFAULT_STUDIO["name"]
+LOCATION = DEFAULT_STUDIO["location"]
 
 # VIBE: 체계적인 커리큘럼을 제시하는 '교육 컨설턴트/전략가' 느낌
-TEACHER_VIBE = "결과로 증명하는, 체계적인 로드맵을 제시하는 교육 전략가"
+TEACHER_VIBE = get_teacher_vibe(DEFAULT_STUDIO, "SEASON")
 
 # ==========================================
 # 2. '겨울방학 특강' 전문 블로그 생성기 (Season Prompt)
 # ==========================================
-def generate_winter_special_post(topic, curriculum_notes):
-    
+def generate_winter_special_post(topic, curriculum_notes, candidate_count=1, studio=None):
+    studio = studio or DEFAULT_STUDIO
+    location = studio["location"]
+    teacher_vibe = get_teacher_vibe(studio, "SEASON")
+
     prompt = f"""
-    당신은 {LOCATION}에서 활동하는 바이올린 교육 전략가이자 '{TEACHER_VIBE}' 선생님입니다.
+    당신은 {location}에서 활동하는 바이올린 교육 전략가이자 '{teacher_vibe}' 선생님입니다.
     이번 글의 목적은 **'겨울방학 특강 모집'**과 **'단기간 실력 향상'**을 어필하여 개인레슨 수강생을 모집하는 것입니다.
     학부모들이 **"이번 방학은 여기다!"**라고 느끼게 만들어야 합니다.
     
@@ -59,11 +65,13 @@ def generate_winter_special_post(topic, curriculum_notes):
 
     try:
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-preview-09-2025')
+        model_name = choose_model('gemini-2.5-flash-preview-09-2025')
+        model = genai.GenerativeModel(model_name)
         
         print(f"❄️ 겨울방학 특강(Season Ver.) 글 쓰는 중... (주제: {topic})")
-        response = model.generate_content(prompt)
-        return response.text
+        response = model.generate_content(prompt, generation_config={"candidate_count": candidate_count})
+        record_usage(model_name, response)
+        return extract_drafts(response, candidate_count)
         
     except Exception as e:
         return f"❌ 에러가 발생했습니다: {e}"
@@ -0,0 +1,245 @@
+import io
+import re
+import asyncio
+import inspect
+from contextvars import ContextVar
+from agents import lazy_import
+from budget import ART_PROMPT_TOKENS, choose_model, current_run, estimate_cost, max_images
+
+# ==============================================================================
+# 1. 파이프라인 엔진 (asyncio DAG)
+# ==============================================================================
+class Stage:
+    """
+    파이프라인의 한 단계. inputs 이름의 값들을 키워드 인자로 받아 output 하나를 만듭니다.
+    - map_over: inputs 중 리스트 값 하나를 골라 항목마다 fn 을 호출 (결과도 리스트)
+    - concurrency: 이 단계에서 동시에 실행할 최대 호출 수
+    - blocking: True 면 모델 호출처럼 오래 걸리는 함수로 보고 워커 스레드(또는 스케줄러)에서 실행
+    """
+    def __init__(self, name, fn, inputs, output, map_over=None, concurrency=1, blocking=True):
+        if map_over is not None and map_over not in inputs:
+            raise ValueError(f"{name}: map_over '{map_over}' 는 inputs 에 있어야 합니다.")
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.output = output
+        self.map_over = map_over
+        self.concurrency = concurrency
+        self.blocking = blocking
+
+class Pipeline:
+    """
+    Stage 들을 출력→입력 이름으로 연결한 DAG 를 asyncio 로 실행합니다.
+    의존성이 없는 단계와 map 단계의 항목들은 concurrency 한도 안에서 동시에 실행되고,
+    map 단계끼리는 항목 단위로 이어집니다. (이미지 1의 그림이 이미지 2의 프롬프트를 기다리지 않음)
+    """
+    def __init__(self, stages, submit=None):
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"단계 이름 '{stage.name}' 이(가) 중복되었습니다.")
+            if stage.output in (s.output for s in self.stages.values()):
+                raise ValueError(f"'{stage.output}' 를 만드는 단계가 둘 이상입니다.")
+            self.stages[stage.name] = stage
+        # submit(fn, **kwargs) -> concurrent.futures.Future. 없으면 asyncio.to_thread 사용
+        self.submit = submit
+        self._check_acyclic()
+
+    def _producers(self):
+        return {s.output: s for s in self.stages.values()}
+
+    def _check_acyclic(self):
+        producers = self._producers()
+        visiting, done = set(), set()
+
+        def visit(stage):
+            if stage.name in done:
+                return
+            if stage.name in visiting:
+                raise ValueError(f"단계 '{stage.name}' 에서 순환 의존성이 발견되었습니다.")
+            visiting.add(stage.name)
+            for key in stage.inputs:
+                if key in producers:
+                    visit(producers[key])
+            visiting.discard(stage.name)
+            done.add(stage.name)
+
+        for stage in self.stages.values():
+            visit(stage)
+
+    async def run(self, initial, on_progress=None):
+        """
+        initial 값에서 시작해 모든 단계를 실행하고 {이름: 값} 을 반환합니다.
+        initial 에 이미 있는 출력을 만드는 단계는 건너뜁니다. (예: 고른 초안이 있으면 writer 생략)
+        실행 중인 태스크가 취소되면 남은 단계와 아직 시작 안 한 작업도 함께 취소됩니다.
+        """
+        active = [s for s in self.stages.values() if s.output not in initial]
+        produced = {s.output for s in active}
+        missing = {k for s in active for k in s.inputs if k not in produced and k not in initial}
+        if missing:
+            raise ValueError(f"파이프라인 입력이 부족합니다: {sorted(missing)}")
+        return await _Execution(self, initial, on_progress).execute(active)
+
+# 지금 실행 중인 단계 (_Execution, 단계 이름). 단계 태스크마다 따로 설정됩니다.
+_current_stage = ContextVar("current_stage", default=None)
+
+def report_progress(state, **event):
+    """
+    단계 함수 안에서 진행 이벤트를 보냅니다. (예: plan_images 가 이미지 수를 줄였을 때)
+    on_progress 가 이벤트 루프 스레드에서 불리도록 blocking=False 단계에서만 사용하세요.
+    """
+    current = _current_stage.get()
+    if current is not None:
+        execution, name = current
+        execution._emit(stage=name, state=state, **event)
+
+class _Execution:
+    """Pipeline.run 한 번의 실행 상태. (같은 Pipeline 을 여러 실행이 동시에 써도 섞이지 않도록 분리)"""
+    def __init__(self, pipeline, initial, on_progress):
+        self.submit = pipeline.submit
+        self._initial = dict(initial)
+        self._on_progress = on_progress
+
+    async def execute(self, active):
+        loop = asyncio.get_running_loop()
+        self._values = {s.output: loop.create_future() for s in active}
+        self._items = {s.output: loop.create_future() for s in active if s.map_over is not None}
+
+        tasks = [asyncio.ensure_future(self._run_stage(s)) for s in active]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            # 실패·취소 시 결과를 기다리던 다른 단계가 남지 않도록 정리
+            for fut in list(self._values.values()) + list(self._items.values()):
+                fut.cancel()
+        return {**self._initial, **{k: f.result() for k, f in self._values.items()}}
+
+    def _emit(self, **event):
+        if self._on_progress is not None:
+            self._on_progress(event)
+
+    async def _value(self, key):
+        if key in self._initial:
+            return self._initial[key]
+        return await asyncio.shield(self._values[key])
+
+    async def _item_futures(self, key):
+        """map 입력의 항목별 awaitable 목록. 앞 단계도 map 이면 그 항목 태스크를 그대로 넘겨받습니다."""
+        if key in self._items:
+            return await asyncio.shield(self._items[key])
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item in await self._value(key):
+            fut = loop.create_future()
+            fut.set_result(item)
+            futures.append(fut)
+        return futures
+
+    async def _call(self, stage, sem, kwargs):
+        async with sem:
+            if inspect.iscoroutinefunction(stage.fn):
+                return await stage.fn(**kwargs)
+            if not stage.blocking:
+                return stage.fn(**kwargs)
+            if self.submit is not None:
+                return await asyncio.wrap_future(self.submit(stage.fn, **kwargs))
+            return await asyncio.to_thread(stage.fn, **kwargs)
+
+    async def _run_stage(self, stage):
+        sem = asyncio.Semaphore(stage.concurrency)
+        _current_stage.set((self, stage.name))
+        if stage.map_over is None:
+            kwargs = {k: await self._value(k) for k in stage.inputs}
+            self._emit(stage=stage.name, state="started")
+            result = await self._call(stage, sem, kwargs)
+        else:
+            shared = {k: await self._value(k) for k in stage.inputs if k != stage.map_over}
+            item_futures = await self._item_futures(stage.map_over)
+            total = len(item_futures)
+            self._emit(stage=stage.name, state="started", total=total)
+            finished = 0
+
+            async def run_item(index, item_future):
+                nonlocal finished
+                item = await item_future
+                value = await self._call(stage, sem, {**shared, stage.map_over: item})
+                finished += 1
+                self._emit(stage=stage.name, state="progress", index=index, value=value, done=finished, total=total)
+                return value
+
+            item_tasks = [asyncio.ensure_future(run_item(i, f)) for i, f in enumerate(item_futures)]
+            self._items[stage.output].set_result(item_tasks)
+            try:
+                result = list(await asyncio.gather(*item_tasks))
+            finally:
+                for task in item_tasks:
+                    task.cancel()
+        self._values[stage.output].set_result(result)
+        self._emit(stage=stage.name, state="done")
+
+# ==============================================================================
+# 2. 블로그 파이프라인 (Writer → Editor → Art Director → Painter)
+# ==============================================================================
+IMAGE_REQ = re.compile(r"\[IMAGE_REQ: (.*?)\]")
+
+# 단계별 기본 동시 실행 수 (이미지 프롬프트·그림은 항목끼리 독립적이라 병렬로)
+DEFAULT_CONCURRENCY = {"writer": 1, "editor": 1, "art": 2, "paint": 2}
+
+def plan_images(html, painter_model, art_model):
+    """에디터가 남긴 [IMAGE_REQ: ...] 중 예산·상한 안에서 그릴 것만 고릅니다. (장마다 아트 디렉터 비용도 포함)"""
+    reqs = IMAGE_REQ.findall(html)
+    art_cost = estimate_cost(choose_model(art_model), *ART_PROMPT_TOKENS)
+    limit = max_images(choose_model(painter_model), extra_per_image=art_cost)
+    if len(reqs) > limit:
+        run = current_run()
+        if run is not None:
+            run.note(f"이미지 {len(reqs)}장 요청 중 {limit}장만 생성 (예산/상한)")
+        report_progress("trimmed", requested=len(reqs), limit=limit)
+        reqs = reqs[:limit]
+    return reqs
+
+def assemble_html(html, image_reqs, images):
+    """그린 이미지 자리·실패 안내로 IMAGE_REQ 태그를 바꾸고, 예산 때문에 건너뛴 태그는 지웁니다."""
+    final_html = html
+    for i, (r, b) in enumerate(zip(image_reqs, images)):
+        fname = f"image_{i+1}.png"
+        if b:
+            rep = f"""<br><div style='background:#f1f3f5; padding:20px; text-align:center; border-radius:10px; margin: 10px 0;'>📸 <b>이미지 자리 ({fname})</b><br><span style='font-size:0.8em; color:#888;'>이곳에 다운받은 이미지를 넣으세요</span></div><br>"""
+        else:
+            rep = f"""<br><div style='background:#fff0f0; padding:10px; text-align:center; border-radius:10px; color:red;'>⚠️ <b>이미지 생성 실패</b><br><span style='font-size:0.8em;'>{r}</span></div><br>"""
+        final_html = final_html.replace(f"[IMAGE_REQ: {r}]", rep, 1)
+    return IMAGE_REQ.sub("", final_html)
+
+def build_zip(final_html, images):
+    """index.html 과 생성된 이미지(image_N.png)를 담은 ZIP 바이트를 만듭니다."""
+    zipfile = lazy_import("zipfile")
+    zip_buf = io.BytesIO()
+    with zipfile.ZipFile(zip_buf, "w") as zf:
+        zf.writestr("index.html", f"<html><body>{final_html}</body></html>")
+        for i, b in enumerate(images):
+            if b:
+                zf.writestr(f"image_{i+1}.png", b)
+    return zip_buf.getvalue()
+
+def build_blog_pipeline(writer, editor, art_director, painter, concurrency=None, submit=None):
+    """
+    에이전트들로 블로그 파이프라인을 구성합니다.
+    입력: mode, topic, notes, studio (또는 이미 고른 draft) / 주요 출력: final_html, zip_bytes
+    """
+    limits = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+    return Pipeline([
+        Stage("writer", lambda mode, topic, notes, studio: writer.write_draft(mode, topic, notes, studio=studio),
+              ["mode", "topic", "notes", "studio"], "draft", concurrency=limits["writer"]),
+        Stage("editor", lambda draft, mode: editor.edit_to_html(draft, mode),
+              ["draft", "mode"], "html", concurrency=limits["editor"]),
+        Stage("plan", lambda html: plan_images(html, painter.model_name, art_director.model_name),
+              ["html"], "image_reqs", blocking=False),
+        Stage("art", lambda image_reqs, mode: art_director.create_prompt(image_reqs, mode),
+              ["image_reqs", "mode"], "image_prompts", map_over="image_reqs", concurrency=limits["art"]),
+        Stage("paint", lambda image_prompts: painter.draw_to_bytes(image_prompts),
+              ["image_prompts"], "images", map_over="image_prompts", concurrency=limits["paint"]),
+        Stage("assemble", assemble_html, ["html", "image_reqs", "images"], "final_html", blocking=False),
+        Stage("package", build_zip, ["final_html", "images"], "zip_bytes", blocking=False),
+    ], submit=submit)
@@ -0,0 +1,88 @@
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import Future
+
+# ==========================================
+# 가중 공정 분배 스케줄러 (Weighted Fair-Share)
+# ==========================================
+class FairShareScheduler:
+    """
+    여러 스튜디오의 작업을 하나의 워커 풀에서 실행합니다.
+    스튜디오마다 큐를 두고, '사용한 시간 / weight' 가 가장 적은 스튜디오의 작업을 먼저 꺼냅니다.
+    같은 스튜디오 안에서는 interactive 작업이 batch 작업보다 먼저 실행됩니다.
+    작업은 제출한 쪽의 contextvars(예: 현재 실행의 예산) 안에서 실행됩니다.
+    """
+    def __init__(self, weights, max_workers=4):
+        self.weights = dict(weights)
+        self._cond = threading.Condition()
+        self._queues = {}   # studio_id -> {"interactive": deque, "batch": deque}
+        self._usage = {}    # studio_id -> 가중치로 나눈 누적 실행 시간 (virtual time)
+        for i in range(max_workers):
+            threading.Thread(target=self._worker, name=f"fair-share-{i}", daemon=True).start()
+
+    def submit(self, studio_id, fn, *args, interactive=True, **kwargs):
+        future = Future()
+        with self._cond:
+            queues = self._queues.setdefault(studio_id, {"interactive": deque(), "batch": deque()})
+            if not self._has_jobs(studio_id):
+                # 한동안 쉬던 스튜디오가 밀린 몫을 몰아서 가져가지 않도록, 현재 활성 스튜디오의 최소 사용량에 맞춤
+                active = [self._usage[s] for s in self._queues if s != studio_id and self._has_jobs(s)]
+                self._usage[studio_id] = max(self._usage.get(studio_id, 0.0), min(active, default=0.0))
+            ctx = contextvars.copy_context()
+            queues["interactive" if interactive else "batch"].append((future, ctx, fn, args, kwargs))
+            self._cond.notify()
+        return future
+
+    def run(self, studio_id, fn, *args, interactive=True, **kwargs):
+        """작업을 제출하고 끝날 때까지 기다려 결과를 돌려줍니다. (Streamlit 스크립트 스레드용)"""
+        return self.submit(studio_id, fn, *args, interactive=interactive, **kwargs).result()
+
+    def promote(self, future):
+        """아직 대기 중인 batch 작업을 interactive 큐로 옮깁니다. (이미 실행 중이거나 interactive 면 False)"""
+        with self._cond:
+            for queues in self._queues.values():
+                for job in queues["batch"]:
+                    if job[0] is future:
+                        queues["batch"].remove(job)
+                        queues["interactive"].append(job)
+                        return True
+        return False
+
+    def _has_jobs(self, studio_id):
+        queues = self._queues.get(studio_id)
+        return bool(queues and (queues["interactive"] or queues["batch"]))
+
+    def _next_job(self):
+        waiting = [s for s in self._queues if self._has_jobs(s)]
+        if not waiting:
+            return None
+        studio_id = min(waiting, key=lambda s: self._usage.get(s, 0.0))
+        queues = self._queues[studio_id]
+        job = (queues["interactive"] or queues["batch"]).popleft()
+        return studio_id, job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                picked = self._next_job()
+                while picked is None:
+                    self._cond.wait()
+                    picked = self._next_job()
+            studio_id, (future, ctx, fn, args, kwargs) = picked
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            try:
+                future.set_result(ctx.run(fn, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                elapsed = time.perf_counter() - started
+                # 사용량 기록이 실패해도 워커 스레드가 죽으면 이후 모든 작업이 멈추므로 여기서 막음
+                try:
+                    with self._cond:
+                        self._usage[studio_id] = self._usage.get(studio_id, 0.0) + elapsed / self.weights.get(studio_id, 1)
+                except Exception as e:
+                    print(f"스케줄러 사용량 기록 실패 ({studio_id}): {e}")
@@ -0,0 +1,59 @@
+import os
+import json
+
+# ==========================================
+# 1. 기본 스튜디오 프로필 (Default)
+# ==========================================
+# studios.json 이 없거나 항목이 비어 있을 때 사용하는 기본값입니다.
+DEFAULT_STUDIO = {
+    "id": "dasan-rami",
+    "name": "다산 라미 바이올린",
+    "location": "남양주 다산신도시",
+    "weight": 1,
+    "teacher_vibes": {
+        "VIRAL": "에너지 넘치고 명쾌한, 꿀팁 대방출하는 다산신도시 정보통",
+        "ELEGANT": "차분하고 우아하며, 아이들을 진심으로 사랑하는 따뜻한 교육자",
+        "SEASON": "결과로 증명하는, 체계적인 로드맵을 제시하는 교육 전략가",
+    },
+}
+
+STUDIOS_PATH = os.environ.get(
+    "VIOLIN_BLOG_STUDIOS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "studios.json"),
+)
+
+# ==========================================
+# 2. 프로필 로드 (Load)
+# ==========================================
+def load_studio_profiles(path=STUDIOS_PATH):
+    """
+    studios.json 에서 스튜디오 프로필 목록을 읽어 {id: profile} 딕셔너리로 반환합니다.
+    빠진 항목(location, teacher_vibes 등)은 DEFAULT_STUDIO 값으로 채웁니다.
+    id 가 없거나 weight 가 0 이하인 항목은 스케줄러를 망가뜨리므로 ValueError 로 거부합니다.
+    파일의 최상위는 스튜디오 객체들의 리스트여야 합니다.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        entries = []
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: 스튜디오 목록은 [ ... ] 리스트여야 합니다. (현재: {type(entries).__name__})")
+
+    profiles = {}
+    for i, entry in enumerate(entries or [DEFAULT_STUDIO]):
+        if not isinstance(entry, dict):
+            raise ValueError(f"{path}: {i+1}번째 스튜디오는 {{...}} 객체여야 합니다.")
+        if not entry.get("id"):
+            raise ValueError(f"{path}: {i+1}번째 스튜디오에 id 가 없습니다.")
+        weight = entry.get("weight", DEFAULT_STUDIO["weight"])
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+            raise ValueError(f"{path}: 스튜디오 '{entry['id']}' 의 weight 는 0보다 큰 숫자여야 합니다. (현재: {weight!r})")
+        profile = {**DEFAULT_STUDIO, **entry}
+        profile["teacher_vibes"] = {**DEFAULT_STUDIO["teacher_vibes"], **entry.get("teacher_vibes", {})}
+        profiles[profile["id"]] = profile
+    return profiles
+
+def get_teacher_vibe(studio, mode):
+    """스튜디오 프로필에서 모드별 선생님 캐릭터(TEACHER_VIBE)를 꺼냅니다."""
+    return studio["teacher_vibes"].get(mode, DEFAULT_STUDIO["teacher_vibes"].get(mode, ""))
@@ -0,0 +1,97 @@
+import json
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from budget import BudgetLedger, MAX_IMAGES_PER_RUN, choose_model, max_images, record_usage, use_run
+from pipeline import plan_images
+
+def response(**usage):
+    return SimpleNamespace(usage_metadata=SimpleNamespace(**usage))
+
+def run_with(spent=0.0, **limits):
+    """limits 로 장부를 만들고, 오늘 사용자 'u' 가 spent 만큼 쓴 상태의 실행을 돌려줍니다."""
+    ledger = BudgetLedger(**limits)
+    ledger.charge("u", spent)
+    return ledger.start_run("u")
+
+# ==========================================
+# 테스트
+# ==========================================
+def test_record_usage_bills_thinking_tokens():
+    run = run_with()
+    with use_run(run):
+        # total 에는 생각 토큰이 포함되고 candidates 에는 빠져 있음
+        record_usage("gemini-3-pro-preview", response(
+            prompt_token_count=1000, candidates_token_count=200, thoughts_token_count=800, total_token_count=2000))
+        # total 이 없으면 candidates + thoughts 로 계산
+        record_usage("gemini-3-pro-preview", response(
+            prompt_token_count=1000, candidates_token_count=200, thoughts_token_count=800))
+
+    assert [i["tokens_out"] for i in run.items] == [1000, 1000]
+    assert run.spent == pytest.approx(2 * (1000 * 2.00 + 1000 * 12.00) / 1_000_000)
+
+def test_record_usage_outside_run_is_ignored():
+    record_usage("gemini-3-pro-preview", response(prompt_token_count=1000, total_token_count=2000))
+
+@pytest.mark.parametrize("limits, spent, expected", [
+    ({}, 0.0, "gemini-3-pro-preview"),
+    ({"per_run": 1.0}, 0.0, "gemini-3-pro-preview"),
+    # 일 한도만 있어도 남은 예산이 적으면 한 단계, 바닥나면 가장 저렴한 모델까지
+    ({"per_user": 1.0}, 0.8, "gemini-2.5-flash-preview-09-2025"),
+    ({"per_day": 1.0}, 5.0, "gemini-2.0-flash"),
+])
+def test_choose_model(limits, spent, expected):
+    run = run_with(spent, **limits)
+    with use_run(run):
+        assert choose_model("gemini-3-pro-preview") == expected
+    assert bool(run.degraded) == (expected != "gemini-3-pro-preview")
+
+def test_choose_model_outside_run_keeps_preferred():
+    assert choose_model("gemini-3-pro-preview") == "gemini-3-pro-preview"
+
+def test_max_images():
+    assert max_images("imagen-4.0-generate-001") == MAX_IMAGES_PER_RUN
+    with use_run(run_with(per_run=0.11)):
+        assert max_images("imagen-4.0-generate-001") == 2
+        assert max_images("imagen-4.0-generate-001", extra_per_image=0.02) == 1
+    with use_run(run_with(per_day=1.0, spent=5.0)):
+        assert max_images("imagen-4.0-generate-001") == 0
+
+def test_plan_images_reserves_art_director_cost():
+    html = "[IMAGE_REQ: a][IMAGE_REQ: b][IMAGE_REQ: c][IMAGE_REQ: d]"
+    run = run_with(per_run=0.125)
+    with use_run(run):
+        # 그림만 보면 3장(0.12$)이지만 장마다 프롬프트 작성 비용을 더하면 2장
+        reqs = plan_images(html, "imagen-4.0-generate-001", "gemini-2.5-flash-preview-09-2025")
+
+    assert reqs == ["a", "b"]
+    assert any("이미지 4장" in note for note in run.degraded)
+
+def test_load_today_skips_broken_lines(tmp_path):
+    today = date.today().isoformat()
+    log = tmp_path / "spend_log.jsonl"
+    log.write_text("\n".join([
+        json.dumps({"at": f"{today}T09:00:00", "user": "a", "spent": 1.5}),
+        json.dumps({"at": "2000-01-01T09:00:00", "user": "a", "spent": 9.0}),
+        json.dumps({"at": f"{today}T10:00:00", "user": "b"}),
+        json.dumps({"at": f"{today}T11:00:00", "user": "b", "spent": 2.0}),
+        '{"at": "' + today + 'T12:00:00", "user": "a", "sp',
+    ]), encoding="utf-8")
+    ledger = BudgetLedger(per_day=10.0, per_user=5.0, log_path=str(log))
+
+    assert ledger.remaining("a") == pytest.approx(3.5)
+    assert ledger.remaining("c") == pytest.approx(5.0)
+    assert ledger.limits_left("b") == [(10.0, pytest.approx(6.5)), (5.0, pytest.approx(3.0))]
+
+def test_finish_appends_report(tmp_path):
+    log = tmp_path / "spend_log.jsonl"
+    ledger = BudgetLedger(log_path=str(log))
+    run = ledger.start_run("a", "magic_fill")
+    run.charge("imagen-4.0-generate-001", 0.04, images=1)
+    run.finish()
+
+    report = json.loads(log.read_text(encoding="utf-8"))
+    assert (report["user"], report["kind"], report["images"]) == ("a", "magic_fill", 1)
+    assert BudgetLedger(per_user=1.0, log_path=str(log)).remaining("a") == pytest.approx(0.96)
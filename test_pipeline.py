@@ -0,0 +1,127 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from pipeline import Pipeline, Stage, build_blog_pipeline
+
+# ==========================================
+# 스텁 에이전트 (모델 호출 없이 파이프라인만 검증)
+# ==========================================
+class StubWriter:
+    def __init__(self):
+        self.calls = 0
+
+    def write_draft(self, mode, topic, notes, studio=None):
+        self.calls += 1
+        return f"draft:{topic}"
+
+class StubEditor:
+    def edit_to_html(self, draft, mode):
+        return f"<p>{draft}</p>[IMAGE_REQ: a][IMAGE_REQ: b]"
+
+class StubArtDirector:
+    model_name = "gemini-2.5-flash-preview-09-2025"
+
+    def create_prompt(self, korean_desc, mode):
+        return f"prompt:{korean_desc}"
+
+class StubPainter:
+    model_name = "imagen-4.0-generate-001"
+
+    def draw_to_bytes(self, prompt):
+        return b"png"
+
+def run(pipeline, initial, events=None):
+    return asyncio.run(pipeline.run(initial, on_progress=events.append if events is not None else None))
+
+# ==========================================
+# 테스트
+# ==========================================
+def test_writer_skipped_when_draft_given():
+    writer = StubWriter()
+    pipeline = build_blog_pipeline(writer, StubEditor(), StubArtDirector(), StubPainter())
+    events = []
+    result = run(pipeline, {"draft": "골라둔 초안", "mode": "KIDS"}, events)
+
+    assert writer.calls == 0
+    assert "writer" not in {e["stage"] for e in events}
+    assert "골라둔 초안" in result["final_html"]
+    assert result["images"] == [b"png", b"png"]
+    assert "[IMAGE_REQ" not in result["final_html"]
+
+def test_map_stages_chain_item_by_item():
+    order = []
+
+    async def first(item):
+        # 0번 항목만 느리게: 1번 항목의 두 번째 단계가 0번을 기다리지 않아야 함
+        await asyncio.sleep(0.1 if item == 0 else 0)
+        order.append(("first", item))
+        return item
+
+    async def second(mid):
+        order.append(("second", mid))
+        return mid * 10
+
+    pipeline = Pipeline([
+        Stage("first", first, ["item"], "mid", map_over="item", concurrency=2),
+        Stage("second", second, ["mid"], "out", map_over="mid", concurrency=2),
+    ])
+    result = run(pipeline, {"item": [0, 1]})
+
+    assert result["out"] == [0, 10]
+    assert order.index(("second", 1)) < order.index(("first", 0))
+
+def test_concurrency_limit():
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+
+    def work(items):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+        return items
+
+    pipeline = Pipeline([Stage("work", work, ["items"], "out", map_over="items", concurrency=2)])
+    result = run(pipeline, {"items": list(range(6))})
+
+    assert result["out"] == list(range(6))
+    assert running["max"] == 2
+
+def test_stage_failure_cancels_the_rest():
+    finished = []
+
+    async def slow(x):
+        await asyncio.sleep(0.5)
+        finished.append("slow")
+        return x
+
+    def boom(x):
+        raise RuntimeError("boom")
+
+    pipeline = Pipeline([
+        Stage("slow", slow, ["x"], "a"),
+        Stage("boom", boom, ["x"], "b", blocking=False),
+        Stage("after", lambda b: finished.append("after"), ["b"], "c", blocking=False),
+    ])
+    with pytest.raises(RuntimeError, match="boom"):
+        run(pipeline, {"x": 1})
+
+    assert finished == []
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="순환"):
+        Pipeline([Stage("a", len, ["y"], "x"), Stage("b", len, ["x"], "y")])
+
+def test_missing_input_is_rejected():
+    pipeline = build_blog_pipeline(StubWriter(), StubEditor(), StubArtDirector(), StubPainter())
+    with pytest.raises(ValueError, match="입력이 부족"):
+        run(pipeline, {"mode": "KIDS"})
+
+def test_duplicate_stage_name_is_rejected():
+    with pytest.raises(ValueError, match="중복"):
+        Pipeline([Stage("a", len, ["x"], "y"), Stage("a", len, ["x"], "z")])
@@ -0,0 +1,51 @@
+import threading
+
+import scheduler
+from scheduler import FairShareScheduler
+
+class FakeClock:
+    """작업이 직접 시간을 흘려보내는 시계. (실제 실행 시간의 흔들림 없이 순서를 검증)"""
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+# ==========================================
+# 테스트
+# ==========================================
+def test_fair_share_follows_weights(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler, "time", clock)
+    sched = FairShareScheduler({"a": 2, "b": 1}, max_workers=1)
+
+    # 워커를 잡아두고 두 스튜디오 작업을 모두 큐에 쌓은 뒤 풀어줌
+    gate = threading.Event()
+    sched.submit("hold", gate.wait)
+    order = []
+
+    def job(studio_id):
+        order.append(studio_id)
+        clock.now += 1.0
+
+    futures = [sched.submit(s, job, s) for s in ["a", "b"] * 4]
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    # weight 2 인 a 가 b 보다 두 배 자주 실행됨
+    assert order[:6] == ["a", "b", "a", "a", "b", "a"]
+
+def test_interactive_runs_before_batch():
+    sched = FairShareScheduler({"a": 1}, max_workers=1)
+    gate = threading.Event()
+    sched.submit("a", gate.wait)
+    order = []
+
+    batch = sched.submit("a", order.append, "batch", interactive=False)
+    interactive = sched.submit("a", order.append, "interactive")
+    gate.set()
+    batch.result(timeout=5)
+    interactive.result(timeout=5)
+
+    assert order == ["interactive", "batch"]
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from studio_profiles import DEFAULT_STUDIO, load_studio_profiles
+
+def write_studios(tmp_path, entries):
+    path = tmp_path / "studios.json"
+    path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+# ==========================================
+# 테스트
+# ==========================================
+def test_missing_file_falls_back_to_default(tmp_path):
+    profiles = load_studio_profiles(str(tmp_path / "없음.json"))
+    assert list(profiles) == [DEFAULT_STUDIO["id"]]
+
+def test_missing_fields_are_filled_from_default(tmp_path):
+    path = write_studios(tmp_path, [{"id": "b", "weight": 2, "teacher_vibes": {"VIRAL": "새 캐릭터"}}])
+    studio = load_studio_profiles(path)["b"]
+
+    assert studio["weight"] == 2
+    assert studio["location"] == DEFAULT_STUDIO["location"]
+    assert studio["teacher_vibes"]["VIRAL"] == "새 캐릭터"
+    assert studio["teacher_vibes"]["ELEGANT"] == DEFAULT_STUDIO["teacher_vibes"]["ELEGANT"]
+
+@pytest.mark.parametrize("entry", [{"name": "id 없음"}, {"id": ""}])
+def test_missing_id_is_rejected(tmp_path, entry):
+    with pytest.raises(ValueError, match="id"):
+        load_studio_profiles(write_studios(tmp_path, [entry]))
+
+@pytest.mark.parametrize("weight", [0, -1, "2", True, None])
+def test_bad_weight_is_rejected(tmp_path, weight):
+    with pytest.raises(ValueError, match="weight"):
+        load_studio_profiles(write_studios(tmp_path, [{"id": "a", "weight": weight}]))
+
+@pytest.mark.parametrize("entries", [{"id": "a"}, ["a"]])
+def test_non_list_file_is_rejected(tmp_path, entries):
+    with pytest.raises(ValueError, match="리스트|객체"):
+        load_studio_profiles(write_studios(tmp_path, entries))
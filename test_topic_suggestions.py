@@ -0,0 +1,179 @@
+import sys
+import json
+import types
+import importlib
+from concurrent.futures import Future
+
+import pytest
+
+import topic_suggestions
+from budget import BudgetLedger, current_run
+from topic_suggestions import TopicSuggestionService, normalize_target_age
+
+# ==========================================
+# 스텁 (모델·스레드 없이 캐시 동작만 검증)
+# ==========================================
+class StubScheduler:
+    """제출된 작업을 쌓아 두었다가 run_pending() 에서 차례로 실행합니다."""
+    def __init__(self):
+        self.jobs = []
+        self.promoted = []
+
+    def submit(self, studio_id, fn, *args, interactive=True, **kwargs):
+        future = Future()
+        self.jobs.append((future, fn, args, interactive))
+        return future
+
+    def promote(self, future):
+        self.promoted.append(future)
+        return True
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, []
+        for future, fn, args, _ in jobs:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+class StubSelector:
+    """agent_topic_selector 대신 replies 를 차례로 돌려줍니다."""
+    def __init__(self):
+        self.replies = []
+        self.calls = []
+        self.runs = []
+
+    def __call__(self, target_age, studio=None, season=None):
+        self.calls.append(target_age)
+        self.runs.append(current_run())
+        return self.replies.pop(0)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+STUDIO = {"id": "dasan-rami"}
+TOPICS_A = "1. [집중력] 첫 번째 주제"
+TOPICS_B = "1. [정서] 두 번째 주제"
+
+@pytest.fixture
+def kids(monkeypatch):
+    """google.generativeai 없이 KIDS 모듈을 import 합니다. (테스트가 끝나면 sys.modules 에서 지움)"""
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+    google = types.ModuleType("google")
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+    monkeypatch.setitem(sys.modules, "naver_blog_kids_lesson_promo", None)
+    monkeypatch.delitem(sys.modules, "naver_blog_kids_lesson_promo")
+    return importlib.import_module("naver_blog_kids_lesson_promo")
+
+@pytest.fixture
+def selector(kids, monkeypatch):
+    selector = StubSelector()
+    monkeypatch.setattr(kids, "agent_topic_selector", selector)
+    return selector
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(topic_suggestions, "time", clock)
+    return clock
+
+# ==========================================
+# 테스트
+# ==========================================
+def test_parse_topic_list(kids):
+    text = "추천 주제입니다.\n1. [집중력] 30분 앉아 있는 힘\n**2) [정서]** 음악으로 표현하기\n❌ 오류: 무언가"
+    assert kids.parse_topic_list(text) == [
+        {"category": "집중력", "title": "30분 앉아 있는 힘"},
+        {"category": "정서", "title": "음악으로 표현하기"},
+    ]
+
+def test_normalize_target_age():
+    assert normalize_target_age(" 6 ~ 7세  유아 ") == normalize_target_age("6-7세 유아") == "6-7세 유아"
+    assert normalize_target_age("초등 1∼2학년") == "초등 1-2학년"
+
+def test_same_key_shares_one_request(selector, clock):
+    scheduler = StubScheduler()
+    service = TopicSuggestionService(scheduler)
+    selector.replies.append(TOPICS_A)
+
+    first = service.request("6-7세 유아", STUDIO, interactive=False)
+    second = service.request("6 ~ 7세 유아", STUDIO)
+    assert first is second
+    assert scheduler.promoted == [first]
+
+    scheduler.run_pending()
+    assert selector.calls == ["6-7세 유아"]
+    assert service.get("6~7세 유아", STUDIO) == [{"category": "집중력", "title": "첫 번째 주제"}]
+
+def test_stale_entry_is_served_while_refreshing(selector, clock):
+    scheduler = StubScheduler()
+    service = TopicSuggestionService(scheduler, ttl=60)
+    selector.replies += [TOPICS_A, TOPICS_B]
+    service.request("7세", STUDIO)
+    scheduler.run_pending()
+
+    clock.now += 60
+    assert service.get("7세", STUDIO)[0]["title"] == "첫 번째 주제"
+    assert [interactive for *_, interactive in scheduler.jobs] == [False]
+
+    scheduler.run_pending()
+    assert service.get("7세", STUDIO)[0]["title"] == "두 번째 주제"
+    assert scheduler.jobs == []
+
+def test_failed_key_waits_before_retry(selector, clock):
+    scheduler = StubScheduler()
+    service = TopicSuggestionService(scheduler, retry_after=60)
+    selector.replies += ["❌ Agent 1 오류: quota", "❌ Agent 1 오류: quota", TOPICS_A]
+
+    failed = service.request("7세", STUDIO)
+    scheduler.run_pending()
+    with pytest.raises(RuntimeError, match="quota"):
+        failed.result()
+
+    # 재시도 대기 중에는 같은 실패를 돌려주고 모델을 다시 부르지 않음
+    assert service.request("7세", STUDIO) is failed
+    assert scheduler.jobs == []
+
+    # 사용자가 직접 다시 시도하면 바로 재호출
+    retried = service.request("7세", STUDIO, retry=True)
+    scheduler.run_pending()
+    with pytest.raises(RuntimeError):
+        retried.result()
+
+    # retry_after 가 지나면 자동으로 다시 요청
+    clock.now += 60
+    service.request("7세", STUDIO)
+    scheduler.run_pending()
+    assert service.get("7세", STUDIO)[0]["title"] == "첫 번째 주제"
+    assert len(selector.calls) == 3
+
+def test_cache_keeps_at_most_max_entries(selector, clock):
+    scheduler = StubScheduler()
+    service = TopicSuggestionService(scheduler, max_entries=2)
+    for age in ["5세", "6세", "7세"]:
+        selector.replies.append(TOPICS_A)
+        service.request(age, STUDIO)
+        scheduler.run_pending()
+        clock.now += 1
+
+    assert service.get("5세", STUDIO) is None
+    assert service.get("6세", STUDIO) is not None
+    assert service.get("7세", STUDIO) is not None
+
+def test_generation_is_charged_to_system_run(selector, clock, tmp_path):
+    log = tmp_path / "spend_log.jsonl"
+    scheduler = StubScheduler()
+    service = TopicSuggestionService(scheduler, ledger=BudgetLedger(log_path=str(log)))
+    selector.replies.append(TOPICS_A)
+    service.request("7세", STUDIO)
+    scheduler.run_pending()
+
+    assert (selector.runs[0].user, selector.runs[0].kind) == ("system", "topics")
+    assert json.loads(log.read_text(encoding="utf-8"))["kind"] == "topics"
@@ -0,0 +1,125 @@
+import re
+import time
+import threading
+from datetime import datetime
+from agents import lazy_import
+from budget import use_run
+
+# ==========================================
+# 1. 설정 (Setup)
+# ==========================================
+# KIDS 모드를 고르면 미리 받아둘 대표 연령대
+COMMON_TARGET_AGES = ("5-6세 유아", "7세 예비 초등학생", "초등 1-2학년", "초등 3-4학년")
+
+SEASONS = {12: "겨울", 1: "겨울", 2: "겨울", 3: "봄", 4: "봄", 5: "봄",
+           6: "여름", 7: "여름", 8: "여름", 9: "가을", 10: "가을", 11: "가을"}
+
+def current_season(now=None):
+    return SEASONS[(now or datetime.now()).month]
+
+def normalize_target_age(target_age):
+    """'6 ~ 7세  유아' 와 '6-7세 유아' 가 같은 캐시를 쓰도록 공백·구분자를 정리합니다."""
+    text = re.sub(r"\s*[~∼-]\s*", "-", target_age.strip().lower())
+    return re.sub(r"\s+", " ", text)
+
+# ==========================================
+# 2. 주제 추천 서비스 (Suggestion Service)
+# ==========================================
+class TopicSuggestionService:
+    """
+    KIDS 전략가(agent_topic_selector) 결과를 (정규화된 연령, 계절, 스튜디오) 단위로 캐시합니다.
+    모델 호출은 scheduler 에서 비동기로 실행되고, 같은 키의 중복 요청은 하나의 Future 를 공유합니다.
+    연령은 자유 입력이라 키가 끝없이 늘 수 있으므로, 캐시는 max_entries 개까지만 (오래된 것부터 버림) 둡니다.
+    ledger 를 주면 생성 한 번을 "system" 사용자의 실행으로 기록해 비용 집계·한도·모델 강등을 적용합니다.
+    """
+    def __init__(self, scheduler, ledger=None, ttl=6 * 60 * 60, retry_after=60, max_entries=64):
+        self.scheduler = scheduler
+        self.ledger = ledger
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache = {}     # key -> (저장 시각, [{"category", "title"}])
+        self._pending = {}   # key -> Future
+        self._failed = {}    # key -> (실패 시각, Future) : 실패한 키를 매 rerun 마다 재호출하지 않도록
+
+    def _key(self, target_age, studio):
+        return (normalize_target_age(target_age), current_season(), studio["id"])
+
+    def get(self, target_age, studio):
+        """
+        캐시가 있으면 주제 리스트를, 없으면 None 을 돌려줍니다. (모델을 기다리지 않음)
+        TTL 이 지난 항목도 그대로 돌려주고, 새 목록은 백그라운드에서 받아 둡니다.
+        """
+        with self._lock:
+            entry = self._cache.get(self._key(target_age, studio))
+        if entry is None:
+            return None
+        if time.time() - entry[0] >= self.ttl:
+            self.request(target_age, studio, interactive=False)
+        return entry[1]
+
+    def request(self, target_age, studio, interactive=True, retry=False):
+        """
+        백그라운드 생성을 시작하고 Future 를 돌려줍니다.
+        최근(retry_after 초 이내)에 실패한 키는 retry=True 가 아니면 실패한 Future 를 그대로 돌려줍니다.
+        이미 batch(프리패치)로 대기 중인 키를 interactive 로 요청하면 interactive 우선순위로 올립니다.
+        """
+        key = self._key(target_age, studio)
+        with self._lock:
+            if key in self._pending:
+                future = self._pending[key]
+                if interactive:
+                    self.scheduler.promote(future)
+                return future
+            failed = self._failed.get(key)
+            if failed and not retry and time.time() - failed[0] < self.retry_after:
+                return failed[1]
+            future = self.scheduler.submit(studio["id"], self._generate, key, target_age, studio, interactive=interactive)
+            self._pending[key] = future
+        return future
+
+    def prefetch(self, studio, target_ages=COMMON_TARGET_AGES):
+        """대표 연령대를 batch 우선순위로 미리 채워 둡니다. (이미 신선하거나 진행 중이면 건너뜀)"""
+        for target_age in target_ages:
+            if self.get(target_age, studio) is None:
+                self.request(target_age, studio, interactive=False)
+
+    def _generate(self, key, target_age, studio):
+        run = self.ledger.start_run("system", "topics") if self.ledger is not None else None
+        try:
+            lazy_import("google.generativeai")
+            kids = lazy_import("naver_blog_kids_lesson_promo")
+            with use_run(run):
+                text = kids.agent_topic_selector(target_age, studio=studio, season=key[1])
+            topics = kids.parse_topic_list(text)
+            if not topics:
+                # 오류 메시지 등은 캐시하지 않고 호출한 쪽에 그대로 전달
+                raise RuntimeError(text)
+            with self._lock:
+                self._cache[key] = (time.time(), topics)
+                self._failed.pop(key, None)
+                self._evict()
+            return topics
+        except Exception:
+            with self._lock:
+                self._failed[key] = (time.time(), self._pending.get(key))
+                self._evict()
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            if run is not None:
+                run.finish()
+
+    def _evict(self):
+        """지난 계절 항목과 재시도 대기가 끝난 실패 기록을 지우고, 남은 것도 max_entries 개로 자릅니다. (_lock 안에서 호출)"""
+        now = time.time()
+        season = current_season()
+        for key in [k for k in self._cache if k[1] != season]:
+            del self._cache[key]
+        for key in [k for k, (failed_at, _) in self._failed.items() if now - failed_at >= self.retry_after]:
+            del self._failed[key]
+        for store in (self._cache, self._failed):
+            while len(store) > self.max_entries:
+                del store[min(store, key=lambda k: store[k][0])]
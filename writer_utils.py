@@ -0,0 +1,11 @@
+# ==========================================
+# 글쓰기 모듈 공용 도우미
+# ==========================================
+def extract_drafts(response, candidate_count=1):
+    """
+    generate_content 응답에서 초안을 꺼냅니다.
+    candidate_count > 1 이면 한 번의 호출로 받은 여러 후보를 리스트로, 아니면 본문 문자열을 반환합니다.
+    """
+    if candidate_count > 1:
+        return ["".join(part.text for part in c.content.parts) for c in response.candidates]
+    return response.text